@@ -0,0 +1,375 @@
+import os
+import sys
+import json
+import time
+import base64
+import random
+import shutil
+import struct
+import platform
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime
+from typing import Optional, Dict, List
+
+try:
+    from mutagen.flac import FLAC, Picture
+    from mutagen.id3 import ID3, TIT2, TPE1, TPE2, TALB, TRCK, TPOS, TDRC, APIC
+    from mutagen.mp4 import MP4, MP4Cover
+    from mutagen.ogg import OggPage
+    from mutagen.oggvorbis import OggVorbis
+except ImportError:
+    print("Error: The 'mutagen' library is required.")
+    print("Please install it by running: pip install mutagen")
+    sys.exit(1)
+
+# resource is POSIX-only; peak RSS is reported as null without it.
+try:
+    import resource
+    resource_available = True
+except ImportError:
+    resource_available = False
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+from AudioOrganizer import SUPPORTED_EXTENSIONS, log, organize_music_folders, pop_option_value
+
+# --- Configuration ---
+DEFAULT_ALBUMS = 100
+DEFAULT_TRACKS_PER_ALBUM = 10
+DEFAULT_ARTISTS = 1
+DEFAULT_SEED = 1
+DEFAULT_REPEAT = 3
+DEFAULT_COVER_BYTES = 32 * 1024
+DEFAULT_RESULTS_FILE = 'benchmark_results.json'
+SAMPLE_RATE = 44100
+TRACK_SECONDS_RANGE = (120, 420)
+LIBRARY_FORMATS = ('flac', 'mp3', 'm4a', 'ogg')
+CONTAINER_EVERY = 15        # every Nth album is split into CD1/CD2 subfolders
+TRACK_GAP_EVERY = 9         # every Nth album is missing track 3
+DUPLICATE_TITLE_EVERY = 7   # every Nth album reuses the previous album's title
+REDUNDANT_DISC_EVERY = 5    # every Nth album tags all tracks as disc 1
+FOLDER_IMAGE_EVERY = 2      # every Nth album has a cover.jpg next to the tracks
+BENCHMARK_TARGETS = ('organize-check', 'organize-full', 'json-from-files', 'rym-from-files')
+
+ID3_FRAMES = {'title': TIT2, 'artist': TPE1, 'albumartist': TPE2, 'album': TALB,
+              'tracknumber': TRCK, 'discnumber': TPOS, 'date': TDRC}
+MP4_ATOMS = {'title': '\xa9nam', 'artist': '\xa9ART', 'albumartist': 'aART', 'album': '\xa9alb', 'date': '\xa9day'}
+
+# --- Synthetic audio files ---
+# Each writer builds the smallest container mutagen accepts (headers and one token block of
+# audio data, with a duration declared in the stream header), then adds the tags and cover through mutagen.
+
+def _cover_picture(cover: bytes) -> Picture:
+    picture = Picture()
+    picture.type, picture.mime, picture.data = 3, 'image/jpeg', cover
+    return picture
+
+def write_flac(path: str, tags: Dict[str, str], cover: Optional[bytes], seconds: int):
+    streaminfo = struct.pack('>HH', 4096, 4096) + b'\0' * 6
+    streaminfo += ((SAMPLE_RATE << 44) | (1 << 41) | (15 << 36) | seconds * SAMPLE_RATE).to_bytes(8, 'big') + b'\0' * 16
+    with open(path, 'wb') as f:
+        f.write(b'fLaC' + bytes([0x80]) + len(streaminfo).to_bytes(3, 'big') + streaminfo)
+    audio = FLAC(path)
+    for key, value in tags.items():
+        audio[key] = value
+    if cover:
+        audio.add_picture(_cover_picture(cover))
+    audio.save()
+
+def write_mp3(path: str, tags: Dict[str, str], cover: Optional[bytes], seconds: int):
+    frame = b'\xff\xfb\x90\x64' + b'\0' * 413  # MPEG-1 Layer III, 128 kbps, 44.1 kHz
+    frame_count = max(1, seconds * SAMPLE_RATE // 1152)
+    xing = frame[:4] + b'\0' * 32 + b'Xing' + struct.pack('>II', 1, frame_count)
+    with open(path, 'wb') as f:
+        f.write(xing + b'\0' * (len(frame) - len(xing)) + frame * 4)
+    id3 = ID3()
+    for key, value in tags.items():
+        id3.add(ID3_FRAMES[key](encoding=3, text=value))
+    if cover:
+        id3.add(APIC(encoding=3, mime='image/jpeg', type=3, desc='', data=cover))
+    id3.save(path)
+
+def _mp4_atom(name: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I4s', 8 + len(payload), name) + payload
+
+def write_m4a(path: str, tags: Dict[str, str], cover: Optional[bytes], seconds: int):
+    mvhd = _mp4_atom(b'mvhd', b'\0' * 4 + struct.pack('>IIII', 0, 0, 1000, seconds * 1000) + b'\0' * 80)
+    mdhd = _mp4_atom(b'mdhd', b'\0' * 4 + struct.pack('>IIIIHH', 0, 0, SAMPLE_RATE, seconds * SAMPLE_RATE, 0, 0))
+    hdlr = _mp4_atom(b'hdlr', b'\0' * 8 + b'soun' + b'\0' * 13)
+    moov = _mp4_atom(b'moov', mvhd + _mp4_atom(b'trak', _mp4_atom(b'mdia', mdhd + hdlr)))
+    with open(path, 'wb') as f:
+        f.write(_mp4_atom(b'ftyp', b'M4A \0\0\0\0M4A mp42isom') + moov + _mp4_atom(b'mdat', b'\0' * 64))
+    audio = MP4(path)
+    for key, value in tags.items():
+        if key in ('tracknumber', 'discnumber'):
+            audio['trkn' if key == 'tracknumber' else 'disk'] = [(int(value), 0)]
+        else:
+            audio[MP4_ATOMS[key]] = [value]
+    if cover:
+        audio['covr'] = [MP4Cover(cover, imageformat=MP4Cover.FORMAT_JPEG)]
+    audio.save()
+
+def write_ogg(path: str, tags: Dict[str, str], cover: Optional[bytes], seconds: int):
+    identification = b'\x01vorbis' + struct.pack('<IBIiiiBB', 0, 2, SAMPLE_RATE, 0, 128000, 0, 0xb8, 1)
+    comment = b'\x03vorbis' + struct.pack('<II', 0, 0) + b'\x01'
+    setup = b'\x05vorbis' + b'\0' * 16
+    pages = []
+    for sequence, (packets, position) in enumerate([([identification], 0), ([comment, setup], 0), ([b'\0' * 64], seconds * SAMPLE_RATE)]):
+        page = OggPage()
+        page.serial, page.sequence, page.position, page.packets = 1, sequence, position, packets
+        pages.append(page)
+    pages[0].first, pages[-1].last = True, True
+    with open(path, 'wb') as f:
+        for page in pages:
+            f.write(page.write())
+    audio = OggVorbis(path)
+    for key, value in tags.items():
+        audio[key] = value
+    if cover:
+        audio['metadata_block_picture'] = [base64.b64encode(_cover_picture(cover).write()).decode('ascii')]
+    audio.save()
+
+FORMAT_WRITERS = {'flac': write_flac, 'mp3': write_mp3, 'm4a': write_m4a, 'ogg': write_ogg}
+
+def generate_library(root_folder: str, albums: int = DEFAULT_ALBUMS, tracks: int = DEFAULT_TRACKS_PER_ALBUM,
+                     artists: int = DEFAULT_ARTISTS, seed: int = DEFAULT_SEED,
+                     cover_bytes: int = DEFAULT_COVER_BYTES) -> Dict:
+    """
+    Writes a reproducible synthetic library of album folders, cycling through FLAC, MP3, M4A and Ogg,
+    with embedded covers, container folders, track gaps, duplicate titles and redundant disc tags
+    mixed in at fixed intervals. Returns a summary of what was generated.
+    """
+    rnd = random.Random(seed)
+    summary = {'albums': albums, 'tracks': 0, 'bytes': 0, 'artists': artists, 'seed': seed,
+               'containers': 0, 'track_gaps': 0, 'duplicate_titles': 0, 'formats': {fmt: 0 for fmt in LIBRARY_FORMATS}}
+    previous_title = None
+
+    for album_index in range(albums):
+        fmt = LIBRARY_FORMATS[album_index % len(LIBRARY_FORMATS)]
+        artist = f"Artist {album_index % artists:02d}"
+        title = f"Album {album_index:05d}"
+        if previous_title and album_index % DUPLICATE_TITLE_EVERY == DUPLICATE_TITLE_EVERY - 1:
+            title = previous_title
+            summary['duplicate_titles'] += 1
+        previous_title = title
+        year = str(rnd.randint(1960, 2024))
+        cover = rnd.randbytes(cover_bytes) if cover_bytes else None
+        is_container = album_index % CONTAINER_EVERY == CONTAINER_EVERY - 1
+        has_gap = tracks >= 3 and album_index % TRACK_GAP_EVERY == TRACK_GAP_EVERY - 1
+
+        album_path = os.path.join(root_folder, f"folder{album_index:05d}")
+        os.makedirs(album_path, exist_ok=True)
+        if album_index % FOLDER_IMAGE_EVERY == 0 and cover:
+            with open(os.path.join(album_path, 'cover.jpg'), 'wb') as f:
+                f.write(cover)
+        summary['containers'] += is_container
+        summary['track_gaps'] += has_gap
+
+        for track in range(1, tracks + 1):
+            if has_gap and track == 3:
+                continue
+            tags = {'title': f"Song {track:03d}", 'artist': artist, 'albumartist': artist, 'album': title,
+                    'tracknumber': str(track), 'date': year}
+            track_dir = album_path
+            if is_container:
+                disc = 1 if track <= (tracks + 1) // 2 else 2
+                tags['discnumber'] = str(disc)
+                track_dir = os.path.join(album_path, f"CD{disc}")
+                os.makedirs(track_dir, exist_ok=True)
+            elif album_index % REDUNDANT_DISC_EVERY == 0:
+                tags['discnumber'] = '1'
+            file_path = os.path.join(track_dir, f"track{track:03d}.{fmt}")
+            FORMAT_WRITERS[fmt](file_path, tags, cover, rnd.randint(*TRACK_SECONDS_RANGE))
+            summary['tracks'] += 1
+            summary['formats'][fmt] += 1
+            summary['bytes'] += os.path.getsize(file_path)
+
+    return summary
+
+def count_audio_files(root_folder: str) -> int:
+    return sum(1 for _, _, files in os.walk(root_folder) for f in files if f.lower().endswith(SUPPORTED_EXTENSIONS))
+
+# --- Measurement ---
+
+def read_io_counters() -> Optional[Dict[str, int]]:
+    """Returns this process's read/write syscall counters from /proc/self/io (Linux only)."""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            counters = dict(line.split(': ') for line in f.read().splitlines())
+        return {'read_syscalls': int(counters['syscr']), 'write_syscalls': int(counters['syscw'])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+def peak_rss_kb() -> Optional[int]:
+    if not resource_available:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def load_target(target: str, library: str):
+    """Imports what a target needs and returns a no-argument callable that runs it once."""
+    if target == 'organize-check':
+        return lambda: organize_music_folders(library, check_only=True)
+    if target == 'organize-full':
+        return lambda: organize_music_folders(library, force_yes=True)
+    if target == 'json-from-files':
+        import JSONFromFiles
+        return lambda: JSONFromFiles.process_directory(library)
+    if target == 'rym-from-files':
+        import RYMFromFiles
+        return lambda: RYMFromFiles.process_directory(library)
+    raise ValueError(f"Unknown benchmark target: {target}")
+
+def run_target(target: str, library: str) -> Dict:
+    """Runs one target in the current process with its output silenced and returns its raw metrics."""
+    try:
+        run = load_target(target, library)
+    except ImportError as e:
+        return {'skipped': f"missing dependency: {e.name}"}
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        io_before = read_io_counters()
+        started = time.perf_counter()
+        run()
+        log.flush()
+        seconds = time.perf_counter() - started
+        io_after = read_io_counters()
+
+    metrics = {'seconds': seconds, 'peak_rss_kb': peak_rss_kb()}
+    for key in ('read_syscalls', 'write_syscalls'):
+        metrics[key] = io_after[key] - io_before[key] if io_before and io_after else None
+    return metrics
+
+def run_target_isolated(target: str, library: str) -> Dict:
+    """Runs a target in a fresh interpreter so peak RSS and syscall counts belong to that run alone."""
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-target', target, library],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'error': (completed.stderr.strip().splitlines() or ['unknown error'])[-1]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def benchmark(library: str, targets: List[str], repeat: int, audio_files: int) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    for target in targets:
+        print(f"Benchmarking {target}...")
+        runs = []
+        for run_index in range(repeat):
+            run_library = library
+            if target == 'organize-full':
+                run_library = os.path.join(os.path.dirname(library), f"{os.path.basename(library)}-full-run")
+                shutil.rmtree(run_library, ignore_errors=True)
+                shutil.copytree(library, run_library)
+            try:
+                metrics = run_target_isolated(target, run_library)
+            finally:
+                if run_library != library:
+                    shutil.rmtree(run_library, ignore_errors=True)
+            if 'seconds' in metrics:
+                metrics['files_per_second'] = audio_files / metrics['seconds'] if metrics['seconds'] else None
+                print(f"  Run {run_index + 1}: {metrics['seconds']:.3f}s, {metrics['files_per_second']:.1f} files/s")
+            else:
+                print(f"  Run {run_index + 1}: {metrics.get('skipped') or metrics.get('error')}")
+            runs.append(metrics)
+            if 'skipped' in metrics:
+                break
+
+        timed = [run for run in runs if 'seconds' in run]
+        results[target] = {'runs': runs}
+        if timed:
+            best = min(timed, key=lambda run: run['seconds'])
+            results[target].update({'best_seconds': best['seconds'], 'best_files_per_second': best['files_per_second'],
+                                    'max_peak_rss_kb': max((run['peak_rss_kb'] or 0) for run in timed) or None})
+    return results
+
+def git_revision() -> Optional[str]:
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR, capture_output=True, text=True)
+        return completed.stdout.strip() or None
+    except OSError:
+        return None
+
+def compare_with_baseline(results: Dict[str, Dict], baseline_path: str):
+    """Prints the change in best time per target against an earlier results file."""
+    try:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: Could not read baseline '{baseline_path}': {e}"); return
+
+    print(f"\n--- Compared with '{baseline_path}' ---")
+    for target, result in results.items():
+        old, new = baseline.get(target, {}).get('best_seconds'), result.get('best_seconds')
+        if old and new:
+            print(f"{target}: {old:.3f}s -> {new:.3f}s ({(new - old) / old * 100:+.1f}%)")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    run_target_value = pop_option_value(args, ['--run-target'])
+    if run_target_value:
+        print(json.dumps(run_target(run_target_value, args[0])))
+        sys.exit(0)
+
+    option_values = {name: pop_option_value(args, [flag]) for name, flag in (
+        ('albums', '--albums'), ('tracks', '--tracks'), ('artists', '--artists'), ('seed', '--seed'),
+        ('repeat', '--repeat'), ('cover_bytes', '--cover-bytes'))}
+    library_path = pop_option_value(args, ['--library'])
+    targets_value = pop_option_value(args, ['--targets'])
+    results_path = pop_option_value(args, ['--out']) or DEFAULT_RESULTS_FILE
+    baseline_path = pop_option_value(args, ['--baseline'])
+    try:
+        albums = int(option_values['albums'] or DEFAULT_ALBUMS)
+        tracks = int(option_values['tracks'] or DEFAULT_TRACKS_PER_ALBUM)
+        artists = max(1, int(option_values['artists'] or DEFAULT_ARTISTS))
+        seed = int(option_values['seed'] or DEFAULT_SEED)
+        repeat = max(1, int(option_values['repeat'] or DEFAULT_REPEAT))
+        cover_bytes = int(option_values['cover_bytes'] if option_values['cover_bytes'] is not None else DEFAULT_COVER_BYTES)
+    except ValueError:
+        print("Error: --albums, --tracks, --artists, --seed, --repeat and --cover-bytes take integers."); sys.exit(1)
+
+    targets = targets_value.split(',') if targets_value else list(BENCHMARK_TARGETS)
+    unknown = [target for target in targets if target not in BENCHMARK_TARGETS]
+    if unknown:
+        print(f"Error: Unknown targets: {', '.join(unknown)}. Choose from: {', '.join(BENCHMARK_TARGETS)}"); sys.exit(1)
+
+    scratch_dir = None
+    if library_path and os.path.isdir(library_path) and os.listdir(library_path):
+        library_path = os.path.abspath(library_path)
+        print(f">>> Reusing library '{library_path}' <<<")
+        library_summary = {'reused': True}
+    else:
+        if not library_path:
+            scratch_dir = tempfile.mkdtemp(prefix='audio-benchmark-')
+            library_path = os.path.join(scratch_dir, 'library')
+        library_path = os.path.abspath(library_path)
+        print(f"Generating {albums} albums x {tracks} tracks in '{library_path}'...")
+        started = time.perf_counter()
+        library_summary = generate_library(library_path, albums, tracks, artists, seed, cover_bytes)
+        print(f"  -> {library_summary['tracks']} files, {library_summary['bytes'] / (1024 * 1024):.1f} MB "
+              f"in {time.perf_counter() - started:.1f}s")
+    audio_files = count_audio_files(library_path)
+    library_summary['audio_files'] = audio_files
+
+    try:
+        results = benchmark(library_path, targets, repeat, audio_files)
+    finally:
+        if scratch_dir:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'library': library_summary,
+        'repeat': repeat,
+        'results': results,
+    }
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to '{results_path}'.")
+
+    if baseline_path:
+        compare_with_baseline(results, baseline_path)
@@ -1,21 +1,264 @@
 import os
 import re
 import sys
+import atexit
+import base64
+import cProfile
 import hashlib
+import io
+import json
+import queue
+import sqlite3
+import struct
+import threading
+import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
 from typing import Optional, Dict, List, Tuple
 
 try:
     from mutagen import File as MutagenFile, MutagenError
+    from mutagen.flac import FLAC, Picture
+    from mutagen.mp4 import MP4
+    from mutagen.ogg import OggFileType
 except ImportError:
     print("Error: The 'mutagen' library is required.")
     print("Please install it by running: pip install mutagen")
     sys.exit(1)
 
+# Pillow is only needed for perceptual cover-art comparison (--similar-covers).
+try:
+    from PIL import Image
+    pil_available = True
+except ImportError:
+    pil_available = False
+
+# pyinstrument is only needed for HTML profiles (--profile run.html); cProfile is used otherwise.
+try:
+    from pyinstrument import Profiler as InstrumentProfiler
+    pyinstrument_available = True
+except ImportError:
+    pyinstrument_available = False
+
+# inotify_simple is only needed for event-driven watch mode (--watch); polling is used without it.
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    inotify_available = True
+except ImportError:
+    inotify_available = False
+
 # --- Configuration ---
 SUPPORTED_EXTENSIONS = ('.mp3', '.flac', '.m4a', '.ogg')
 SUPPORTED_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tif', '.tiff')
 PATH_LENGTH_LIMIT_BYTES = 230
+DEFAULT_JOBS = 1
+PROCESS_POOL_CHUNKSIZE = 8
+CACHE_SCHEMA_VERSION = 1
+COVER_SAMPLE_WINDOW_BYTES = 16 * 1024
+COVER_HASH_CHUNK_BYTES = 1024 * 1024
+ID3_FRAME_HEADER_PROBE_BYTES = 4096
+PERCEPTUAL_HASH_SIZE = 8
+COVER_SIMILARITY_MAX_DISTANCE = 6
+JOURNAL_FILENAME = '.audio_organizer_journal.jsonl'
+JOURNAL_CHECKPOINT_OPS = 256
+PLAN_FORMAT_VERSION = 1
+METRICS_SLOWEST_FOLDERS = 10
+WATCH_DEBOUNCE_SECONDS = 10.0
+WATCH_POLL_INTERVAL_SECONDS = 30.0
+WATCH_READ_TIMEOUT_MS = 1000
+LOG_QUIET, LOG_NORMAL, LOG_VERBOSE = 0, 1, 2
+LOG_BATCH_MAX_RECORDS = 1024
+LOG_PROGRESS_INTERVAL_SECONDS = 0.2
+LOG_PIPED_PROGRESS_INTERVAL_SECONDS = 10.0
+
+class RunLog:
+    """
+    Console and log-file output for a run. Each message has a level (LOG_QUIET, LOG_NORMAL, LOG_VERBOSE)
+    and reaches the console only up to the configured verbosity; with a log file, every message is also
+    written there as a JSON line with its event name and fields, whatever the verbosity.
+    Messages are queued to a background thread that writes them in batches, so callers never wait on the
+    terminal; flush() blocks until everything queued so far is written. In worker processes, which exit
+    without stopping that thread, messages are written directly instead.
+    Long loops report through a single progress line with a rate and ETA (start_progress/advance/end_progress),
+    redrawn in place on a terminal and printed every LOG_PIPED_PROGRESS_INTERVAL_SECONDS otherwise.
+    """
+    LEVEL_NAMES = {LOG_QUIET: 'always', LOG_NORMAL: 'info', LOG_VERBOSE: 'detail'}
+
+    def __init__(self):
+        self.verbosity = LOG_NORMAL
+        self.log_path: Optional[str] = None
+        self._pid = os.getpid()
+        self._direct = False
+        self._file = None
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._progress: Optional[Dict] = None
+        self._progress_line: Optional[str] = None
+
+    def configure(self, verbosity: int = LOG_NORMAL, log_path: Optional[str] = None):
+        """Sets the console verbosity and starts a new log file (if log_path is given)."""
+        self.close()
+        self.verbosity, self.log_path = verbosity, log_path
+        if log_path:
+            open(log_path, 'wb').close()
+            # Append mode, so lines written by worker processes are never overwritten.
+            self._file = open(log_path, 'ab', buffering=0)
+
+    def message(self, level: int, text: str, event: Optional[str] = None, **fields):
+        to_console = level <= self.verbosity
+        if not to_console and self.log_path is None:
+            return
+        record = ('message', to_console, level, text, event, fields, time.time())
+        if os.getpid() != self._pid:
+            self.enter_worker_process()
+        if self._direct:
+            self._write_batch([record])
+        else:
+            self._enqueue(record)
+
+    def always(self, text: str, event: Optional[str] = None, **fields):
+        """Errors, warnings and run results, shown even with --quiet."""
+        self.message(LOG_QUIET, text, event, **fields)
+
+    def info(self, text: str, event: Optional[str] = None, **fields):
+        self.message(LOG_NORMAL, text, event, **fields)
+
+    def detail(self, text: str, event: Optional[str] = None, **fields):
+        """Per-folder and per-file messages, shown with --verbose and always written to the log file."""
+        self.message(LOG_VERBOSE, text, event, **fields)
+
+    def start_progress(self, label: str, total: int, unit: str):
+        now = time.perf_counter()
+        self._progress = {'label': label, 'total': total, 'unit': unit, 'done': 0, 'started': now, 'shown': now}
+
+    def advance(self, count: int = 1):
+        progress = self._progress
+        if progress is None or self.verbosity != LOG_NORMAL:
+            return
+        progress['done'] += count
+        now = time.perf_counter()
+        interactive = sys.stdout.isatty()
+        interval = LOG_PROGRESS_INTERVAL_SECONDS if interactive else LOG_PIPED_PROGRESS_INTERVAL_SECONDS
+        if now - progress['shown'] < interval and progress['done'] < progress['total']:
+            return
+        if not interactive and progress['done'] >= progress['total']:
+            return
+        progress['shown'] = now
+        elapsed = max(now - progress['started'], 1e-9)
+        rate = progress['done'] / elapsed
+        remaining = (progress['total'] - progress['done']) / rate if rate else 0.0
+        minutes, seconds = divmod(int(remaining), 60)
+        line = (f"  {progress['label']}: {progress['done']}/{progress['total']} {progress['unit']}, "
+                f"{rate:.1f}/s, ETA {minutes}m{seconds:02d}s")
+        if interactive:
+            self._enqueue(('progress', line))
+        else:
+            self.message(LOG_NORMAL, line, 'progress')
+
+    def end_progress(self):
+        if self._progress is not None and sys.stdout.isatty():
+            self._enqueue(('progress', None))
+        self._progress = None
+
+    def flush(self):
+        """Blocks until every message queued so far has been written."""
+        if self._direct or self._writer is None or os.getpid() != self._pid:
+            return
+        written = threading.Event()
+        self._queue.put(('flush', written))
+        written.wait()
+
+    def close(self):
+        if os.getpid() != self._pid:
+            return
+        if self._writer is not None and not self._direct:
+            self.end_progress()
+            self._queue.put(('stop',))
+            self._writer.join()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _enqueue(self, record: Tuple):
+        if self._direct or os.getpid() != self._pid:
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, name='RunLog', daemon=True)
+            self._writer.start()
+        self._queue.put(record)
+
+    def enter_worker_process(self, verbosity: Optional[int] = None, log_path: Optional[str] = None):
+        """Drops any state inherited from the parent process and switches to direct writes."""
+        if verbosity is not None:
+            self.verbosity, self.log_path = verbosity, log_path
+        self._pid = os.getpid()
+        self._direct = True
+        self._writer, self._progress, self._progress_line = None, None, None
+        self._queue = queue.SimpleQueue()
+        self._file = open(self.log_path, 'ab', buffering=0) if self.log_path else None
+
+    def _run_writer(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < LOG_BATCH_MAX_RECORDS:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Tuple]) -> bool:
+        """Writes a batch with one console write and one log-file write. Returns True on a stop record."""
+        console: List[str] = []
+        file_lines: List[str] = []
+        had_progress_line = self._progress_line is not None
+        progress_changed = stop = False
+        for record in batch:
+            kind = record[0]
+            if kind == 'message':
+                _, to_console, level, text, event, fields, timestamp = record
+                if to_console:
+                    console.append(text + '\n')
+                if self._file is not None:
+                    entry = {'time': round(timestamp, 6), 'level': self.LEVEL_NAMES[level], 'event': event, 'message': text}
+                    entry.update(fields)
+                    file_lines.append(json.dumps(entry, ensure_ascii=False) + '\n')
+            elif kind == 'progress':
+                self._progress_line = record[1]
+                progress_changed = True
+            elif kind == 'stop':
+                stop = True
+
+        if console or progress_changed:
+            text = '\r\x1b[K' if had_progress_line else ''
+            text += ''.join(console) + (self._progress_line or '')
+            try:
+                if text:
+                    sys.stdout.write(text)
+                    sys.stdout.flush()
+            except (OSError, ValueError):
+                pass
+        if file_lines:
+            try:
+                self._file.write(''.join(file_lines).encode('utf-8'))
+            except (OSError, ValueError):
+                pass
+
+        for record in batch:
+            if record[0] == 'flush':
+                record[1].set()
+        return stop
+
+log = RunLog()
+atexit.register(log.close)
+
+def init_worker_log(verbosity: int, log_path: Optional[str]):
+    """Process pool initializer that gives workers the parent's verbosity and log file."""
+    log.enter_worker_process(verbosity, log_path)
 
 def sanitize_filename(name: str, is_path_component: bool = False) -> str:
     """Cleans a string to be a valid filename or folder name."""
@@ -29,258 +272,1336 @@ def sanitize_filename(name: str, is_path_component: bool = False) -> str:
     name = name.strip(' .')
     return name
 
-def get_audio_metadata(file_path: str) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+TagValues = Dict[str, Optional[str]]
+
+VORBIS_TAG_KEYS = {
+    'album': 'album', 'artist': 'artist', 'albumartist': 'albumartist', 'title': 'title',
+    'date': 'date', 'track': 'tracknumber', 'disc': 'discnumber'
+}
+ID3_TAG_FRAMES = {
+    'album': 'TALB', 'artist': 'TPE1', 'albumartist': 'TPE2', 'title': 'TIT2',
+    'date': 'TDRC', 'track': 'TRCK', 'disc': 'TPOS'
+}
+MP4_TAG_ATOMS = {
+    'album': '\xa9alb', 'artist': '\xa9ART', 'albumartist': 'aART', 'title': '\xa9nam', 'date': '\xa9day'
+}
+
+def _first_value(values) -> Optional[str]:
+    """Returns the first entry of a tag value list as a string, or None."""
+    return str(values[0]) if values else None
+
+def read_vorbis_tags(audio) -> TagValues:
+    """Reads the raw tag values from a Vorbis comment block (FLAC, Ogg)."""
+    tags = audio.tags or {}
+    return {key: _first_value(tags.get(name)) for key, name in VORBIS_TAG_KEYS.items()}
+
+def read_id3_tags(audio) -> TagValues:
+    """Reads the raw tag values from an ID3 tag (MP3)."""
+    tags = audio.tags
+    if tags is None:
+        return {key: None for key in ID3_TAG_FRAMES}
+    values = {}
+    for key, frame_id in ID3_TAG_FRAMES.items():
+        frame = tags.get(frame_id)
+        values[key] = _first_value(frame.text) if frame is not None else None
+    return values
+
+def read_mp4_tags(audio) -> TagValues:
+    """Reads the raw tag values from an MP4 'ilst' atom (M4A)."""
+    tags = audio.tags or {}
+    values = {key: _first_value(tags.get(atom)) for key, atom in MP4_TAG_ATOMS.items()}
+    for key, atom in (('track', 'trkn'), ('disc', 'disk')):
+        pairs = tags.get(atom)
+        if pairs:
+            number, total = pairs[0]
+            values[key] = f"{number}/{total}" if total else str(number)
+        else:
+            values[key] = None
+    return values
+
+def read_flac_pictures(audio) -> List[bytes]:
+    """Returns the embedded picture data of a FLAC file."""
+    return [picture.data for picture in audio.pictures]
+
+def read_ogg_pictures(audio) -> List[bytes]:
+    """Returns the picture data stored in METADATA_BLOCK_PICTURE comments of an Ogg file."""
+    pictures = []
+    for encoded in (audio.tags or {}).get('metadata_block_picture', []):
+        try:
+            pictures.append(Picture(base64.b64decode(encoded)).data)
+        except (ValueError, MutagenError):
+            continue
+    return pictures
+
+def read_id3_pictures(audio) -> List[bytes]:
+    """Returns the data of every APIC frame in an ID3 tag."""
+    return [frame.data for frame in audio.tags.getall('APIC')] if audio.tags is not None else []
+
+def read_mp4_pictures(audio) -> List[bytes]:
+    """Returns the cover atoms of an MP4 file."""
+    return [bytes(cover) for cover in (audio.tags or {}).get('covr', [])]
+
+CONTAINER_READERS = (
+    (FLAC, read_vorbis_tags, read_flac_pictures),
+    (OggFileType, read_vorbis_tags, read_ogg_pictures),
+    (MP4, read_mp4_tags, read_mp4_pictures),
+)
+
+def select_container_reader(audio):
+    """Picks the tag and picture readers that match the container type of an opened file."""
+    for file_type, tag_reader, picture_reader in CONTAINER_READERS:
+        if isinstance(audio, file_type):
+            return tag_reader, picture_reader
+    return read_id3_tags, read_id3_pictures
+
+class UnsupportedLayout(Exception):
+    """Raised by a native scanner when a file has to go through the full mutagen parser."""
+
+PictureRef = Tuple[int, int]
+ScanResult = Tuple[TagValues, int, Optional[PictureRef]]
+
+def _syncsafe(data: bytes) -> int:
+    """Decodes a 28-bit ID3v2 syncsafe integer."""
+    if any(byte & 0x80 for byte in data):
+        raise UnsupportedLayout("invalid syncsafe integer")
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+def parse_vorbis_comment(data: bytes) -> TagValues:
+    """Parses a raw Vorbis comment block and returns the first value of each wanted tag."""
+    vendor_length = struct.unpack_from('<I', data, 0)[0]
+    pos = 4 + vendor_length
+    comment_count = struct.unpack_from('<I', data, pos)[0]
+    pos += 4
+    found: Dict[str, str] = {}
+    for _ in range(comment_count):
+        length = struct.unpack_from('<I', data, pos)[0]
+        pos += 4
+        key, sep, value = data[pos:pos + length].decode('utf-8', 'replace').partition('=')
+        pos += length
+        if sep:
+            found.setdefault(key.lower(), value)
+    return {key: found.get(name) for key, name in VORBIS_TAG_KEYS.items()}
+
+def scan_flac(f) -> ScanResult:
+    """Walks the FLAC metadata blocks, reading the Vorbis comment and only the headers of PICTURE blocks."""
+    magic = f.read(4)
+    if magic[:3] == b'ID3':
+        id3_header = magic + f.read(6)
+        f.seek(10 + _syncsafe(id3_header[6:10]))
+        magic = f.read(4)
+    if magic != b'fLaC':
+        raise UnsupportedLayout("not a FLAC stream")
+
+    raw: Optional[TagValues] = None
+    picture_count, first_picture = 0, None
+    last_block = False
+    while not last_block:
+        block_header = f.read(4)
+        if len(block_header) < 4:
+            raise UnsupportedLayout("truncated metadata block")
+        last_block = bool(block_header[0] & 0x80)
+        code, size = block_header[0] & 0x7F, int.from_bytes(block_header[1:], 'big')
+        start = f.tell()
+        if code == 4 and raw is None:
+            raw = parse_vorbis_comment(f.read(size))
+        elif code == 6:
+            picture_count += 1
+            if first_picture is None:
+                _, mime_length = struct.unpack('>II', f.read(8))
+                f.seek(mime_length, 1)
+                description_length = struct.unpack('>I', f.read(4))[0]
+                f.seek(description_length + 16, 1)
+                data_length = struct.unpack('>I', f.read(4))[0]
+                if f.tell() + data_length > start + size:
+                    raise UnsupportedLayout("picture block size mismatch")
+                first_picture = (f.tell(), data_length)
+        f.seek(start + size)
+    return raw or dict.fromkeys(VORBIS_TAG_KEYS), picture_count, first_picture
+
+def _iter_mp4_atoms(f, start: int, end: int):
+    """Yields (name, payload_start, atom_end) for the atoms between start and end."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, name = struct.unpack('>I4s', f.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size or pos + size > end:
+            raise UnsupportedLayout("invalid atom size")
+        yield name, pos + header_size, pos + size
+        pos += size
+
+def _find_mp4_atom(f, start: int, end: int, name: bytes) -> Optional[Tuple[int, int]]:
+    for atom_name, payload_start, atom_end in _iter_mp4_atoms(f, start, end):
+        if atom_name == name:
+            return payload_start, atom_end
+    return None
+
+def scan_mp4(f) -> ScanResult:
+    """Walks moov.udta.meta.ilst, reading text and number atoms and only the headers of 'covr' data atoms."""
+    f.seek(0, os.SEEK_END)
+    file_end = f.tell()
+    f.seek(4)
+    if f.read(4) != b'ftyp':
+        raise UnsupportedLayout("not an MP4 file")
+
+    raw: TagValues = dict.fromkeys(VORBIS_TAG_KEYS)
+    span: Optional[Tuple[int, int]] = (0, file_end)
+    for name in (b'moov', b'udta', b'meta', b'ilst'):
+        span = _find_mp4_atom(f, span[0], span[1], name)
+        if span is None:
+            return raw, 0, None
+        if name == b'meta':
+            span = (span[0] + 4, span[1])
+
+    atom_keys = {atom.encode('latin-1'): key for key, atom in MP4_TAG_ATOMS.items()}
+    atom_keys.update({b'trkn': 'track', b'disk': 'disc'})
+    picture_count, first_picture = 0, None
+    for item_name, item_start, item_end in _iter_mp4_atoms(f, span[0], span[1]):
+        if item_name == b'covr':
+            for child_name, child_start, child_end in _iter_mp4_atoms(f, item_start, item_end):
+                if child_name == b'data':
+                    picture_count += 1
+                    if first_picture is None:
+                        first_picture = (child_start + 8, child_end - child_start - 8)
+        elif item_name in atom_keys and raw[atom_keys[item_name]] is None:
+            data_span = _find_mp4_atom(f, item_start, item_end, b'data')
+            if data_span is None:
+                continue
+            f.seek(data_span[0] + 8)
+            payload = f.read(data_span[1] - data_span[0] - 8)
+            if item_name in (b'trkn', b'disk'):
+                if len(payload) >= 6:
+                    number, total = struct.unpack('>HH', payload[2:6])
+                    raw[atom_keys[item_name]] = f"{number}/{total}" if total else str(number)
+            else:
+                raw[atom_keys[item_name]] = payload.decode('utf-8', 'replace')
+    return raw, picture_count, first_picture
+
+ID3_TEXT_ENCODINGS = ('latin-1', 'utf-16', 'utf-16-be', 'utf-8')
+ID3_NULL_TERMINATORS = (b'\x00', b'\x00\x00', b'\x00\x00', b'\x00')
+
+def _decode_id3_text(payload: bytes) -> Optional[str]:
+    """Decodes the first value of an ID3 text frame."""
+    if not payload or payload[0] > 3:
+        raise UnsupportedLayout("invalid text encoding")
+    return payload[1:].decode(ID3_TEXT_ENCODINGS[payload[0]], 'replace').split('\x00')[0]
+
+def _locate_apic_data(f, body_start: int, body_size: int) -> PictureRef:
+    """Finds the image data inside an APIC frame by reading only its header fields."""
+    f.seek(body_start)
+    head = f.read(min(body_size, ID3_FRAME_HEADER_PROBE_BYTES))
+    encoding = head[0]
+    if encoding > 3:
+        raise UnsupportedLayout("invalid text encoding")
+    mime_end = head.find(b'\x00', 1)
+    if mime_end < 0:
+        raise UnsupportedLayout("APIC header too long")
+    terminator = ID3_NULL_TERMINATORS[encoding]
+    pos = mime_end + 2
+    while True:
+        pos = head.find(terminator, pos)
+        if pos < 0:
+            raise UnsupportedLayout("APIC header too long")
+        if len(terminator) == 1 or (pos - mime_end - 2) % 2 == 0:
+            break
+        pos += 1
+    data_start = pos + len(terminator)
+    return body_start + data_start, body_size - data_start
+
+def _id3_v23_date(texts: Dict[str, str]) -> Optional[str]:
+    """Builds a TDRC-style timestamp from ID3v2.3 TYER/TDAT/TIME, like mutagen's update_to_v24."""
+    year_match = re.match(r"([0-9]{4})(-[0-9]{2}-[0-9]{2})?\Z", texts.get('TYER') or '')
+    if not year_match:
+        return None
+    year, month_day = year_match.groups()
+    date_match = re.match(r"([0-9]{2})([0-9]{2})\Z", texts.get('TDAT') or '')
+    time_match = re.match(r"([0-9]{2})([0-9]{2})\Z", texts.get('TIME') or '')
+    timestamp = year
+    if date_match:
+        month_day = "-%s-%s" % date_match.groups()[::-1]
+    if month_day:
+        timestamp += month_day
+        if time_match:
+            timestamp += "T%s:%s:00" % time_match.groups()
+    return timestamp
+
+def scan_id3(f) -> ScanResult:
+    """Walks the frames of an ID3v2.3/2.4 tag, reading text frames and only the headers of APIC frames."""
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b'ID3':
+        raise UnsupportedLayout("no ID3v2 tag")
+    major, flags = header[3], header[5]
+    if major not in (3, 4) or flags & 0x80:
+        raise UnsupportedLayout("unsupported ID3v2 version or unsynchronised tag")
+    tag_end = 10 + _syncsafe(header[6:10])
+    pos = 10
+    if flags & 0x40:
+        extended_size = f.read(4)
+        pos += _syncsafe(extended_size) if major == 4 else 4 + struct.unpack('>I', extended_size)[0]
+
+    wanted_text_frames = set(ID3_TAG_FRAMES.values()) | {'TYER', 'TDAT', 'TIME'}
+    format_flag_mask = 0x4F if major == 4 else 0xE0
+    texts: Dict[str, str] = {}
+    picture_count, first_picture = 0, None
+    while pos + 10 <= tag_end:
+        f.seek(pos)
+        frame_header = f.read(10)
+        frame_id = frame_header[:4]
+        if frame_id == b'\x00\x00\x00\x00':
+            break
+        if not re.fullmatch(rb'[A-Z0-9]{4}', frame_id):
+            raise UnsupportedLayout("invalid frame id")
+        size = _syncsafe(frame_header[4:8]) if major == 4 else struct.unpack('>I', frame_header[4:8])[0]
+        body_start = pos + 10
+        if body_start + size > tag_end:
+            raise UnsupportedLayout("frame exceeds tag")
+        name = frame_id.decode('ascii')
+        if name == 'APIC' or (name in wanted_text_frames and name not in texts):
+            if frame_header[9] & format_flag_mask:
+                raise UnsupportedLayout("compressed, encrypted or unsynchronised frame")
+            if name == 'APIC':
+                picture_count += 1
+                if first_picture is None:
+                    first_picture = _locate_apic_data(f, body_start, size)
+            else:
+                texts[name] = _decode_id3_text(f.read(size))
+        pos = body_start + size
+
+    raw = {key: texts.get(frame_id) for key, frame_id in ID3_TAG_FRAMES.items()}
+    if raw['date'] is None:
+        raw['date'] = _id3_v23_date(texts)
+    return raw, picture_count, first_picture
+
+NATIVE_SCANNERS = {'.flac': scan_flac, '.m4a': scan_mp4, '.mp3': scan_id3}
+
+def cover_fingerprint(data_length: int, samples: List[bytes]) -> str:
+    """Combines the picture length and sampled windows into a fingerprint string."""
+    digest = hashlib.md5()
+    for sample in samples:
+        digest.update(sample)
+    return f"{data_length}:{digest.hexdigest()}"
+
+def _sample_offsets(data_length: int) -> List[int]:
+    """Returns the relative offsets of the start, middle and end sample windows."""
+    if data_length <= 3 * COVER_SAMPLE_WINDOW_BYTES:
+        return [0]
+    return [0, (data_length - COVER_SAMPLE_WINDOW_BYTES) // 2, data_length - COVER_SAMPLE_WINDOW_BYTES]
+
+def fingerprint_file_range(f, offset: int, length: int) -> str:
+    """Fingerprints a picture stored at a file offset, reading only bounded sample windows."""
+    samples = []
+    window = length if length <= 3 * COVER_SAMPLE_WINDOW_BYTES else COVER_SAMPLE_WINDOW_BYTES
+    for relative in _sample_offsets(length):
+        f.seek(offset + relative)
+        samples.append(f.read(window))
+    return cover_fingerprint(length, samples)
+
+def fingerprint_bytes(data: bytes) -> str:
+    """Fingerprints an in-memory picture exactly like fingerprint_file_range would."""
+    length = len(data)
+    window = length if length <= 3 * COVER_SAMPLE_WINDOW_BYTES else COVER_SAMPLE_WINDOW_BYTES
+    return cover_fingerprint(length, [data[relative:relative + window] for relative in _sample_offsets(length)])
+
+def hash_file_range(file_path: str, offset: int, length: int) -> str:
+    """MD5 of a byte range, streamed in fixed-size chunks."""
+    digest = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(COVER_HASH_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def scan_with_fingerprint(file_path: str) -> Optional[Tuple[TagValues, int, Optional[str], Optional[PictureRef]]]:
     """
-    Extracts metadata from a given audio file.
-    Returns a tuple: (metadata_dict, warning_string_or_None)
+    Reads tags and a cover fingerprint without loading picture data.
+    Returns None when the file has no native scanner or an unusual layout.
     """
+    scanner = NATIVE_SCANNERS.get(os.path.splitext(file_path)[1].lower())
+    if scanner is None:
+        return None
     try:
-        audio = MutagenFile(file_path, easy=True)
-
-        album = artist = albumartist = title = date = track = disc = year = invalid_year_tag = None
-
-        if audio:
-            album = audio.get('album', [None])[0]
-            artist = audio.get('artist', [None])[0]
-            albumartist = audio.get('albumartist', [None])[0]
-            title = audio.get('title', [None])[0]
-            date = audio.get('date', [None])[0]
-            track = audio.get('tracknumber', [None])[0]
-            disc = audio.get('discnumber', [None])[0]
-        
-        if date:
-            date_str = str(date).strip()
+        with open(file_path, 'rb') as f:
+            raw, picture_count, first_picture = scanner(f)
+            fingerprint = fingerprint_file_range(f, *first_picture) if first_picture else None
+        return raw, picture_count, fingerprint, first_picture
+    except (UnsupportedLayout, struct.error, IndexError, OSError):
+        return None
+
+def read_file_range(file_path: str, offset: int, length: int) -> bytes:
+    """Reads a byte range from a file."""
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+def perceptual_hash(image_data: bytes) -> Optional[str]:
+    """
+    Computes a 64-bit difference hash (dHash) of an image on a downscaled grayscale thumbnail.
+    Returns it as a hex string, or None if the image cannot be decoded.
+    """
+    try:
+        with Image.open(io.BytesIO(image_data)) as img:
+            img.draft('L', (PERCEPTUAL_HASH_SIZE * 8, PERCEPTUAL_HASH_SIZE * 8))
+            thumb = img.convert('L').resize((PERCEPTUAL_HASH_SIZE + 1, PERCEPTUAL_HASH_SIZE), Image.BILINEAR)
+            pixels = thumb.tobytes()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+    bits = 0
+    width = PERCEPTUAL_HASH_SIZE + 1
+    for row in range(PERCEPTUAL_HASH_SIZE):
+        for col in range(PERCEPTUAL_HASH_SIZE):
+            bits = (bits << 1) | (pixels[row * width + col] > pixels[row * width + col + 1])
+    return f"{bits:0{PERCEPTUAL_HASH_SIZE * PERCEPTUAL_HASH_SIZE // 4}x}"
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+class BKTree:
+    """BK-tree over integer perceptual hashes, queried by Hamming distance."""
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, hash_val: int, item):
+        """Adds an item under a hash; items with identical hashes share one node."""
+        if self.root is None:
+            self.root = (hash_val, [item], {})
+            return
+        node = self.root
+        while True:
+            distance = hamming_distance(hash_val, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (hash_val, [item], {})
+                return
+            node = child
+
+    def query(self, hash_val: int, max_distance: int) -> List[Tuple[int, object]]:
+        """Returns (distance, item) pairs for every item within max_distance of hash_val."""
+        matches = []
+        pending = [self.root] if self.root is not None else []
+        while pending:
+            node = pending.pop()
+            distance = hamming_distance(hash_val, node[0])
+            if distance <= max_distance:
+                matches.extend((distance, item) for item in node[1])
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    pending.append(child)
+        return matches
+
+class TrackRecord:
+    """
+    Metadata of one audio file. Slotted, with repeated values (album, artist, year, track/disc
+    numbers, cover hashes) interned, so a whole-library scan keeps a small fixed-size object per
+    track and one copy of each shared string. as_dict()/from_dict() convert to and from the JSON
+    form stored in the scan cache.
+    """
+    __slots__ = ('filename', 'album', 'year', 'artist', 'title', 'track', 'disc', 'albumartist',
+                 'invalid_year_tag', 'cover_art_count', 'cover_art_hash', 'cover_art_fingerprint',
+                 'cover_art_ref', 'cover_art_phash')
+    INTERNED_FIELDS = frozenset(('album', 'year', 'artist', 'track', 'disc', 'albumartist',
+                                 'cover_art_hash', 'cover_art_fingerprint', 'cover_art_phash'))
+    OPTIONAL_FIELDS = ('cover_art_fingerprint', 'cover_art_ref', 'cover_art_phash')
+
+    def __init__(self, filename: Optional[str] = None, **fields):
+        self.filename = filename
+        for name in self.__slots__[1:]:
+            value = fields.get(name)
+            if type(value) is str and name in self.INTERNED_FIELDS:
+                value = sys.intern(value)
+            setattr(self, name, value)
+        self.cover_art_count = self.cover_art_count or 0
+        if self.cover_art_ref is not None:
+            self.cover_art_ref = tuple(self.cover_art_ref)
+
+    @classmethod
+    def from_dict(cls, metadata: Dict, filename: Optional[str] = None) -> 'TrackRecord':
+        return cls(filename, **metadata)
+
+    def as_dict(self) -> Dict:
+        """Returns the cacheable fields, leaving out the optional cover fields that were never set."""
+        metadata = {name: getattr(self, name) for name in self.__slots__[1:]}
+        for name in self.OPTIONAL_FIELDS:
+            if metadata[name] is None:
+                del metadata[name]
+        if 'cover_art_ref' in metadata:
+            metadata['cover_art_ref'] = list(metadata['cover_art_ref'])
+        return metadata
+
+def get_audio_metadata(file_path: str, fingerprint_covers: bool = False,
+                       perceptual_memo: Optional[Dict[str, Optional[str]]] = None) -> Tuple[Optional[TrackRecord], Optional[str]]:
+    """
+    Extracts metadata and cover art info from a given audio file, opening it only once.
+    In fingerprint mode, pictures are identified by a sampled fingerprint and only hashed
+    in full later if two fingerprints collide (see resolve_cover_hashes).
+    If perceptual_memo is given, a perceptual hash of the cover is added as well; the memo
+    maps exact cover hashes to perceptual ones so each distinct image is decoded once.
+    Returns a tuple: (track_record, warning_string_or_None)
+    """
+    try:
+        scanned = scan_with_fingerprint(file_path) if fingerprint_covers else None
+        pictures: List[bytes] = []
+        if scanned:
+            raw, picture_count, fingerprint, picture_ref = scanned
+            full_hash = None
+        else:
+            audio = MutagenFile(file_path)
+
+            raw = dict.fromkeys(VORBIS_TAG_KEYS)
+            if audio is not None:
+                tag_reader, picture_reader = select_container_reader(audio)
+                raw = tag_reader(audio)
+                try:
+                    pictures = picture_reader(audio)
+                except (KeyError, IndexError):
+                    pictures = []
+            picture_count, picture_ref = len(pictures), None
+            full_hash = hashlib.md5(pictures[0]).hexdigest() if pictures else None
+            fingerprint = fingerprint_bytes(pictures[0]) if pictures and fingerprint_covers else None
+
+        year = invalid_year_tag = None
+        if raw['date']:
+            date_str = raw['date'].strip()
             if re.fullmatch(r'\d{4}', date_str):
                 year = date_str
             else:
                 invalid_year_tag = date_str
         
-        metadata = {
-            'album': str(album) if album else None, 'year': str(year) if year else None,
-            'artist': str(artist) if artist else None, 'title': str(title) if title else None,
-            'track': str(track) if track else None, 'disc': str(disc) if disc else None,
-            'albumartist': str(albumartist) if albumartist else None,
-            'invalid_year_tag': invalid_year_tag
-        }
+        phash = None
+        if perceptual_memo is not None:
+            memo_key = full_hash or fingerprint
+            if memo_key and memo_key not in perceptual_memo:
+                image_data = pictures[0] if pictures else read_file_range(file_path, *picture_ref)
+                perceptual_memo[memo_key] = perceptual_hash(image_data)
+            phash = perceptual_memo.get(memo_key) if memo_key else None
+
+        metadata = TrackRecord(
+            album=raw['album'] or None, year=year,
+            artist=raw['artist'] or None, title=raw['title'] or None,
+            track=raw['track'] or None, disc=raw['disc'] or None,
+            albumartist=raw['albumartist'] or None,
+            invalid_year_tag=invalid_year_tag,
+            cover_art_count=picture_count,
+            cover_art_hash=full_hash,
+            cover_art_fingerprint=fingerprint if fingerprint_covers else None,
+            cover_art_ref=picture_ref if fingerprint_covers else None,
+            cover_art_phash=phash
+        )
         return metadata, None
         
     except MutagenError as e:
         warning = f"Could not read metadata from {os.path.basename(file_path)}: {e}"
-        print(f"  [Warning] {warning}")
+        log.detail(f"  [Warning] {warning}", 'read_error', path=file_path, error=str(e))
         return None, warning
 
-def get_cover_art_info(file_path: str) -> Tuple[int, Optional[str]]:
-    """Gets cover art count and a hash of the first art piece from a file."""
-    try:
-        audio = MutagenFile(file_path)
-        if not audio: return 0, None
-
-        pictures = []
-        if hasattr(audio, 'pictures') and audio.pictures:  
-            pictures = audio.pictures
-        elif 'APIC:' in audio:  
-            pictures = audio.tags.getall('APIC:')
-        elif 'covr' in audio:  
-            pictures = audio['covr']
-
-        count = len(pictures)
-        hash_val = None
-        if count > 0:
-            pic_data = pictures[0].data if hasattr(pictures[0], 'data') else pictures[0]
-            hash_val = hashlib.md5(pic_data).hexdigest()
-        return count, hash_val
-    except (MutagenError, KeyError, IndexError):
-        return 0, None
-
-def remove_redundant_disc_tags(info: Dict, final_name: str, general_warnings: List[str]):
-    """Removes the 'discnumber' tag from files and updates the in-memory metadata."""
-    print(f"  -> Removing redundant discnumber tag from files in '{final_name}'...")
+def resolve_cover_hashes(dirpath: str, files_metadata: List[TrackRecord]) -> List[TrackRecord]:
+    """
+    Computes full, streamed cover hashes for tracks whose sampled fingerprints collide,
+    so check_albums never treats two different images as the same one.
+    Returns the records that received a new hash.
+    """
+    by_fingerprint: Dict[str, List[TrackRecord]] = {}
+    for md in files_metadata:
+        if md.cover_art_fingerprint:
+            by_fingerprint.setdefault(md.cover_art_fingerprint, []).append(md)
+
+    updated = []
+    for group in by_fingerprint.values():
+        if len(group) < 2:
+            continue
+        for md in group:
+            if md.cover_art_hash or not md.cover_art_ref:
+                continue
+            offset, length = md.cover_art_ref
+            try:
+                md.cover_art_hash = sys.intern(hash_file_range(os.path.join(dirpath, md.filename), offset, length))
+                updated.append(md)
+            except OSError:
+                continue
+    return updated
+
+class ScanCache:
+    """
+    On-disk SQLite cache of get_audio_metadata results, keyed by path, size and mtime_ns.
+    Every thread or worker process opens its own connection on first use, so one
+    instance can be shared with a thread pool or pickled into a process pool.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.abspath(db_path)
+        self._local = threading.local()
+        conn = self._connection()
+        if conn.execute('PRAGMA user_version').fetchone()[0] != CACHE_SCHEMA_VERSION:
+            conn.execute('DROP TABLE IF EXISTS tracks')
+            conn.execute(f'PRAGMA user_version = {CACHE_SCHEMA_VERSION}')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS tracks ('
+            'path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, metadata TEXT NOT NULL)'
+        )
+        conn.commit()
+
+    def __getstate__(self):
+        return {'db_path': self.db_path}
+
+    def __setstate__(self, state):
+        self.db_path = state['db_path']
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=60)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, path: str, stat: os.stat_result) -> Optional[Dict]:
+        """Returns the cached metadata for a file if its size and mtime are unchanged."""
+        row = self._connection().execute(
+            'SELECT size, mtime_ns, metadata FROM tracks WHERE path = ?', (path,)
+        ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return json.loads(row[2])
+        return None
+
+    def put_many(self, entries: List[Tuple[str, os.stat_result, Dict]]):
+        """Stores (path, stat, metadata) entries in a single transaction."""
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO tracks (path, size, mtime_ns, metadata) VALUES (?, ?, ?, ?)',
+                [(path, stat.st_size, stat.st_mtime_ns, json.dumps(metadata)) for path, stat, metadata in entries]
+            )
+
+    def invalidate(self, path: str):
+        """Drops the entry for a file whose contents were changed."""
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM tracks WHERE path = ?', (path,))
+
+    def move(self, old_path: str, new_path: str):
+        """Re-keys the entry of a renamed file."""
+        conn = self._connection()
+        with conn:
+            conn.execute('UPDATE OR REPLACE tracks SET path = ? WHERE path = ?', (new_path, old_path))
+
+    def move_tree(self, old_dir: str, new_dir: str):
+        """Re-keys the entries of every file below a renamed folder."""
+        prefix = old_dir.rstrip(os.sep) + os.sep
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'UPDATE OR REPLACE tracks SET path = ? || substr(path, ?) WHERE path >= ? AND path < ?',
+                (new_dir.rstrip(os.sep), len(prefix), prefix, prefix + '\uffff')
+            )
+
+    def close(self):
+        """Closes the connection opened by the calling thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+class PlanWriter:
+    """
+    Streams a plan to a JSON-lines file while Phase 2 builds it. Records are
+    {'type': 'header' | 'tag_edit' | 'file' | 'folder' | 'album_warnings' | 'warning', ...}.
+    """
+
+    def __init__(self, path: str, root_folder: str):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        self.write('header', version=PLAN_FORMAT_VERSION, root=root_folder)
+
+    def write(self, record_type: str, **fields):
+        self._file.write(json.dumps({'type': record_type, **fields}, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self._file.close()
+
+def read_plan(plan_path: str) -> Dict:
+    """Loads a plan written by PlanWriter into lists, one per record type."""
+    plan = {'root': None, 'tag_edit': [], 'file': [], 'folder': [], 'album_warnings': {}, 'warning': []}
+    with open(plan_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record_type = record.get('type')
+            if record_type == 'header':
+                if record.get('version') != PLAN_FORMAT_VERSION:
+                    raise ValueError(f"Unsupported plan version {record.get('version')} in '{plan_path}'")
+                plan['root'] = record['root']
+            elif record_type == 'tag_edit':
+                plan['tag_edit'].append((record['path'], record['delete']))
+            elif record_type in ('file', 'folder'):
+                plan[record_type].append((record['old'], record['new']))
+            elif record_type == 'album_warnings':
+                plan['album_warnings'][record['album']] = record['tags']
+            elif record_type == 'warning':
+                plan['warning'].append(record['message'])
+            else:
+                raise ValueError(f"Unknown record type '{record_type}' on line {line_number} of '{plan_path}'")
+    if plan['root'] is None:
+        raise ValueError(f"'{plan_path}' has no plan header")
+    return plan
+
+TagEdit = Tuple[str, List[str]]
+
+def remove_redundant_disc_tags(info: Dict, final_name: str, tag_edits: List[TagEdit], plan: Optional[PlanWriter] = None):
+    """
+    Queues removal of the 'discnumber' tag from an album's files. The edits are applied later by the
+    tag-write stage (apply_tag_edits); with a plan writer they are also recorded in the plan, and only
+    counted in tag_edits. The in-memory metadata keeps its disc numbers until clear_removed_disc_tags
+    is given the edits that succeeded.
+    """
+    log.detail(f"  -> Planning removal of redundant discnumber tag from files in '{final_name}'...", 'plan_tag_edit', path=info['path'])
     for md in info['files_metadata']:
-        filename = md['filename']
-        file_path = os.path.join(info['path'], filename)
+        file_path = os.path.join(info['path'], md.filename)
+        if plan is not None:
+            plan.write('tag_edit', path=file_path, delete=['discnumber'])
+        tag_edits.append((file_path, ['discnumber']))
+
+def clear_removed_disc_tags(folder_info: List[Dict], tag_edits: List[TagEdit], failed_paths: set):
+    """Clears the disc number of every file whose queued discnumber removal was applied."""
+    removed = {file_path for file_path, tag_names in tag_edits if 'discnumber' in tag_names} - failed_paths
+    for info in folder_info:
+        for md in info['files_metadata']:
+            if os.path.join(info['path'], md.filename) in removed:
+                md.disc = None
+
+def drop_renames_after_failed_tag_edits(file_rename_plan: List[Tuple[str, str]], failed_paths: set,
+                                        general_warnings: List[str]) -> List[Tuple[str, str]]:
+    """
+    Drops the planned file renames of every folder where a tag edit failed: their new names were
+    planned as if the edit had been applied, so the folder is left as it is for the next run.
+    """
+    failed_folders = {os.path.dirname(file_path) for file_path in failed_paths}
+    for folder in sorted(failed_folders):
+        general_warnings.append(f"[Error] Skipped file renames in '{os.path.basename(folder)}' because its tags could not be updated.")
+    return [(old, new) for old, new in file_rename_plan if os.path.dirname(old) not in failed_folders]
+
+def apply_tag_edit(file_path: str, tag_names: List[str]) -> Tuple[bool, bool, int]:
+    """
+    Deletes tag_names from one file. The freed space is kept as padding, so the tags are rewritten
+    in place and the audio payload is left where it is whenever the container allows it.
+    Returns (changed, in_place, bytes_rewritten), where bytes_rewritten is the file size when the
+    payload had to be moved and 0 for an in-place edit.
+    """
+    audio = MutagenFile(file_path, easy=True)
+    if not audio or not any(tag in audio for tag in tag_names):
+        return False, False, 0
+    for tag in tag_names:
+        if tag in audio:
+            del audio[tag]
+
+    layout = {}
+    def keep_padding(info) -> int:
+        layout['in_place'] = info.padding >= 0
+        return info.padding if info.padding >= 0 else info.get_default_padding()
+
+    audio.save(padding=keep_padding)
+    if layout.get('in_place'):
+        return True, True, 0
+    return True, False, os.path.getsize(file_path)
+
+def _disk_order_key(edit: TagEdit) -> Tuple[int, int]:
+    try:
+        stat = os.stat(edit[0])
+        return stat.st_dev, stat.st_ino
+    except OSError:
+        return 0, 0
+
+def _try_apply_tag_edit(edit: TagEdit):
+    try:
+        return apply_tag_edit(*edit), None
+    except Exception as e:
+        return None, e
+
+def apply_tag_edits(tag_edits: List[TagEdit], general_warnings: List[str], jobs: int = DEFAULT_JOBS,
+                    cache: Optional[ScanCache] = None) -> Dict:
+    """
+    Tag-write stage: applies queued (file_path, tag_names) edits in inode order, which approximates
+    on-disk order, through at most `jobs` worker threads, then reports the throughput.
+    Returns {'updated', 'in_place', 'bytes_rewritten', 'failed'}, where 'failed' is the set of file
+    paths whose edit raised an error.
+    """
+    if not tag_edits:
+        return {'updated': 0, 'in_place': 0, 'bytes_rewritten': 0, 'failed': set()}
+    log.info(f"\nUpdating tags in {len(tag_edits)} files...")
+    ordered = sorted(tag_edits, key=_disk_order_key)
+    started = time.perf_counter()
+    if jobs <= 1 or len(ordered) <= 1:
+        results = map(_try_apply_tag_edit, ordered)
+        executor = None
+    else:
+        executor = ThreadPoolExecutor(max_workers=jobs)
+        results = executor.map(_try_apply_tag_edit, ordered)
+
+    updated = in_place = bytes_rewritten = 0
+    failed = set()
+    log.start_progress('Updating tags', len(ordered), 'files')
+    try:
+        for (file_path, _), (result, error) in zip(ordered, results):
+            log.advance()
+            if error is not None:
+                general_warnings.append(f"[Error] Could not update tags for {os.path.basename(file_path)}: {error}")
+                failed.add(file_path)
+                continue
+            changed, was_in_place, rewritten = result
+            if not changed:
+                continue
+            log.detail(f"  Updated tags: '{os.path.basename(file_path)}'", 'tag_edit', path=file_path,
+                       in_place=was_in_place, bytes_rewritten=rewritten)
+            updated += 1
+            in_place += was_in_place
+            bytes_rewritten += rewritten
+            if cache is not None:
+                cache.invalidate(file_path)
+    finally:
+        log.end_progress()
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    log.info(f"  Updated {updated} files ({in_place} in place) in {elapsed:.2f}s: "
+             f"{updated / elapsed:.1f} files/s, {bytes_rewritten / (1024 * 1024):.2f} MB rewritten.")
+    return {'updated': updated, 'in_place': in_place, 'bytes_rewritten': bytes_rewritten, 'failed': failed}
+
+_FILE_ENTRY = 0
+_LINKED_DIR_ENTRY = 1
+
+class DirectoryIndex:
+    """
+    In-memory snapshot of a folder tree, built once with os.scandir.
+    Each node is {'entries': {name: _FILE_ENTRY | _LINKED_DIR_ENTRY | node}, 'link': bool, 'unreadable': bool},
+    with entries kept in directory order. Like os.walk, symlinked folders are listed but
+    not descended into; they are only scanned on demand. Callers that change the tree
+    report it through rename() and remove() so the index stays accurate.
+    """
+
+    def __init__(self, root_folder: str):
+        self.root = os.path.abspath(root_folder)
+        self.scandir_calls = 0
+        self.tree = self._scan_tree(self.root)
+
+    def _scan_dir(self, path: str) -> Dict:
+        self.scandir_calls += 1
+        node = {'entries': {}, 'link': False, 'unreadable': False}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        node['entries'][entry.name] = _FILE_ENTRY
+                    else:
+                        node['entries'][entry.name] = _LINKED_DIR_ENTRY if entry.is_symlink() else None
+        except OSError:
+            node['unreadable'] = True
+        return node
+
+    def _scan_tree(self, path: str) -> Dict:
+        root_node = self._scan_dir(path)
+        pending = [(path, root_node)]
+        while pending:
+            dirpath, node = pending.pop()
+            for name, child in node['entries'].items():
+                if child is None:
+                    child_path = os.path.join(dirpath, name)
+                    child_node = self._scan_dir(child_path)
+                    node['entries'][name] = child_node
+                    pending.append((child_path, child_node))
+        return root_node
+
+    def _node(self, path: str) -> Optional[Dict]:
+        """Returns the node of a folder inside the index, scanning symlinked folders on first access."""
+        path = os.path.abspath(path)
+        if path == self.root:
+            return self.tree
+        if not path.startswith(self.root + os.sep):
+            return None
+        node, current = self.tree, self.root
+        for part in path[len(self.root) + 1:].split(os.sep):
+            child = node['entries'].get(part)
+            current = os.path.join(current, part)
+            if child == _LINKED_DIR_ENTRY:
+                child = self._scan_dir(current)
+                child['link'] = True
+                node['entries'][part] = child
+            if not isinstance(child, dict):
+                return None
+            node = child
+        return node
+
+    def walk(self, top: Optional[str] = None):
+        """Yields (dirpath, dirnames, filenames) top-down like os.walk, honouring in-place pruning of dirnames."""
+        top = os.path.abspath(top) if top else self.root
+        top_node = self._node(top)
+        pending = [(top, top_node)] if top_node else []
+        while pending:
+            dirpath, node = pending.pop()
+            if node['unreadable']:
+                continue
+            dirnames = [name for name, child in node['entries'].items() if child != _FILE_ENTRY]
+            filenames = [name for name, child in node['entries'].items() if child == _FILE_ENTRY]
+            yield dirpath, dirnames, filenames
+            for name in reversed(dirnames):
+                child = node['entries'].get(name)
+                if isinstance(child, dict) and not child['link']:
+                    pending.append((os.path.join(dirpath, name), child))
+
+    def listdir(self, path: str) -> List[str]:
+        """Returns the entry names of a folder, falling back to os.listdir outside the index."""
+        node = self._node(path)
+        if node is None or node['unreadable']:
+            return os.listdir(path)
+        return list(node['entries'])
+
+    def has_audio(self, path: str) -> bool:
+        """Tells whether a folder directly contains a supported audio file."""
         try:
-            audio = MutagenFile(file_path, easy=True)
-            if audio and 'discnumber' in audio:
-                del audio['discnumber']
-                audio.save()
-                md['disc'] = None
-        except Exception as e:
-            general_warnings.append(f"[Error] Could not update tags for {filename} in '{final_name}': {e}")
-
-def flatten_container_folder(dirpath: str, dirnames: List[str], general_warnings: List[str]) -> bool:
+            return any(name.lower().endswith(SUPPORTED_EXTENSIONS) for name in self.listdir(path))
+        except OSError:
+            return False
+
+    def exists(self, path: str) -> bool:
+        parent = self._node(os.path.dirname(os.path.abspath(path)))
+        if parent is None:
+            return os.path.exists(path)
+        return os.path.basename(path) in parent['entries']
+
+    def rename(self, old_path: str, new_path: str):
+        """Moves a file or folder entry (with its whole subtree) to a new path."""
+        old_parent = self._node(os.path.dirname(os.path.abspath(old_path)))
+        new_parent = self._node(os.path.dirname(os.path.abspath(new_path)))
+        if old_parent is None:
+            return
+        entry = old_parent['entries'].pop(os.path.basename(old_path), _FILE_ENTRY)
+        if new_parent is not None:
+            new_parent['entries'][os.path.basename(new_path)] = entry
+
+    def remove(self, path: str):
+        parent = self._node(os.path.dirname(os.path.abspath(path)))
+        if parent is not None:
+            parent['entries'].pop(os.path.basename(path), None)
+
+class AlbumNameIndex:
+    """
+    Case-folded index of the names that exist, or are planned, in the parent folders of albums.
+    Only parents loaded with add_parent() are indexed, and lookups never touch the disk; callers keep
+    it current through add() and remove(), which ignore parents that are not indexed.
+    """
+
+    def __init__(self):
+        self._names: Dict[str, Dict[str, set]] = {}
+
+    @classmethod
+    def from_directory_index(cls, index: DirectoryIndex, parents) -> 'AlbumNameIndex':
+        """Indexes the given parent folders from the directory index's cached listings."""
+        names = cls()
+        for parent in parents:
+            names.add_parent(parent, index.listdir(parent))
+        return names
+
+    def indexes(self, parent: str) -> bool:
+        return parent in self._names
+
+    def add_parent(self, parent: str, entries: List[str]):
+        folded: Dict[str, set] = {}
+        for name in entries:
+            folded.setdefault(name.casefold(), set()).add(name)
+        self._names[parent] = folded
+
+    def add(self, parent: str, name: str):
+        folded = self._names.get(parent)
+        if folded is not None:
+            folded.setdefault(name.casefold(), set()).add(name)
+
+    def remove(self, parent: str, name: str):
+        folded = self._names.get(parent, {})
+        variants = folded.get(name.casefold())
+        if variants is not None:
+            variants.discard(name)
+            if not variants:
+                del folded[name.casefold()]
+
+    def contains(self, parent: str, name: str, own_name: Optional[str] = None) -> bool:
+        """Tells whether name is taken in parent, ignoring own_name (the folder's current name) if given."""
+        variants = self._names.get(parent, {}).get(name.casefold())
+        return bool(variants) and (own_name is None or bool(variants - {own_name}))
+
+def assign_album_folder_names(folder_info: List[Dict]) -> List[str]:
+    """
+    Returns each album's planned folder name, in folder_info order, from two case-folded hash indexes:
+    albums sharing a title get their year appended, and names that still collide are numbered
+    from (1) in path order.
+    """
+    albums_by_title: Dict[str, List[Dict]] = {}
+    for info in folder_info:
+        albums_by_title.setdefault(info['album'].casefold(), []).append(info)
+
+    base_names: List[str] = []
+    base_name_counts: Counter = Counter()
+    for info in folder_info:
+        base_name = sanitize_filename(info['album'])
+        if len(albums_by_title[info['album'].casefold()]) > 1 and info['year']:
+            base_name = f"{base_name} ({info['year']})"
+        base_names.append(base_name)
+        base_name_counts[base_name.casefold()] += 1
+
+    final_names: List[str] = []
+    numbering_counters: Counter = Counter()
+    for base_name in base_names:
+        folded = base_name.casefold()
+        if base_name_counts[folded] > 1:
+            numbering_counters[folded] += 1
+            base_name = f"{base_name} ({numbering_counters[folded]})"
+        final_names.append(base_name)
+    return final_names
+
+def flatten_container_folder(dirpath: str, dirnames: List[str], general_warnings: List[str],
+                             index: Optional[DirectoryIndex] = None) -> bool:
     """Moves files from subfolders into the parent, then deletes empty subfolders."""
-    print(f"  -> Flattening '{os.path.basename(dirpath)}'...")
+    log.info(f"  -> Flattening '{os.path.basename(dirpath)}'...", 'flatten', path=dirpath)
+    exists = index.exists if index else os.path.exists
     try:
         for subfolder_name in dirnames:
             subfolder_path = os.path.join(dirpath, subfolder_name)
-            for filename in os.listdir(subfolder_path):
+            for filename in (index.listdir(subfolder_path) if index else os.listdir(subfolder_path)):
                 source_path = os.path.join(subfolder_path, filename)
                 dest_path = os.path.join(dirpath, filename)
                 
-                if os.path.exists(dest_path):
+                if exists(dest_path):
                     name, ext = os.path.splitext(filename)
                     counter = 1
-                    while os.path.exists(dest_path):
+                    while exists(dest_path):
                         dest_path = os.path.join(dirpath, f"{name} ({counter}){ext}")
                         counter += 1
                 
                 os.rename(source_path, dest_path)
+                if index: index.rename(source_path, dest_path)
             os.rmdir(subfolder_path)
-        print(f"  -> Flattening complete.")
+            if index: index.remove(subfolder_path)
+        log.info(f"  -> Flattening complete.")
         return True
     except OSError as e:
         general_warnings.append(f"[Error] Failed to flatten folder '{os.path.basename(dirpath)}': {e}")
         return False
 
-def analyze_album_folder(dirpath: str, filenames: List[str]) -> Optional[Dict]:
+def collect_album_folders(index: DirectoryIndex, general_warnings: List[str], check_only: bool = False,
+                          force_yes: bool = False, force_no: bool = False,
+                          include_root: bool = False) -> List[Tuple[str, List[str]]]:
+    """
+    Walks the index, prompting to flatten container folders, and returns the (dirpath, filenames)
+    of every folder to analyze. The index root itself is only included with include_root.
+    """
+    analysis_tasks: List[Tuple[str, List[str]]] = []
+
+    for dirpath, dirnames, filenames in index.walk():
+        if dirpath == index.root and not include_root: continue
+
+        is_true_container = any(index.has_audio(os.path.join(dirpath, subfolder_name)) for subfolder_name in dirnames)
+
+        if is_true_container:
+            parent_name = os.path.basename(dirpath)
+            choice = 'n' if check_only or force_no else 'y' if force_yes else ''
+            if not choice:
+                log.flush()
+                try: choice = input(f"\nContainer folder '{parent_name}' found. Flatten? (y/n): ").lower()
+                except (EOFError, KeyboardInterrupt): log.info("\nCancelled."); choice = 'n'
+            
+            if choice == 'y':
+                if flatten_container_folder(dirpath, dirnames, general_warnings, index):
+                    dirnames[:], filenames = [], index.listdir(dirpath)
+                    analysis_tasks.append((dirpath, filenames))
+                continue
+            else:
+                general_warnings.append(f"[Container Folder] '{parent_name}' was skipped.")
+                dirnames[:]=[]
+                continue
+        
+        analysis_tasks.append((dirpath, filenames))
+
+    return analysis_tasks
+
+def analyze_album_folder(dirpath: str, filenames: List[str], cache: Optional[ScanCache] = None,
+                         fingerprint_covers: bool = False, perceptual_covers: bool = False) -> Optional[Dict]:
     """Analyzes a single folder, collects all file metadata, and returns a summary."""
     audio_files_with_ext = [f for f in filenames if f.lower().endswith(SUPPORTED_EXTENSIONS)]
     if not audio_files_with_ext: return None
 
-    print(f"Analyzing: {os.path.basename(dirpath)}")
+    log.detail(f"Analyzing: {os.path.basename(dirpath)}", 'analyze_folder', path=dirpath)
     
-    files_metadata = []
+    started = time.perf_counter()
+    stats = {'files_parsed': 0, 'cache_hits': 0, 'parse_seconds': 0.0, 'cover_hash_seconds': 0.0}
+    files_metadata: List[TrackRecord] = []
     album_warnings = []
+    cover_key = 'cover_art_fingerprint' if fingerprint_covers else 'cover_art_hash'
+    perceptual_memo: Optional[Dict[str, Optional[str]]] = {} if perceptual_covers else None
+    fresh_cache_entries = []
     for filename in audio_files_with_ext:
         filepath = os.path.join(dirpath, filename)
-        metadata, warning = get_audio_metadata(filepath)
+        metadata, warning, stat = None, None, None
+        if cache is not None:
+            try:
+                stat = os.stat(filepath)
+                cached = cache.get(filepath, stat)
+            except OSError:
+                stat, cached = None, None
+            if cached and cached.get('cover_art_count') and not cached.get(cover_key):
+                cached = None
+            if cached and perceptual_covers and cached.get('cover_art_count') and 'cover_art_phash' not in cached:
+                cached = None
+            metadata = TrackRecord.from_dict(cached) if cached else None
+
+        if metadata is None:
+            parse_started = time.perf_counter()
+            metadata, warning = get_audio_metadata(filepath, fingerprint_covers, perceptual_memo)
+            stats['parse_seconds'] += time.perf_counter() - parse_started
+            stats['files_parsed'] += 1
+            if metadata and stat is not None:
+                fresh_cache_entries.append((filepath, stat, metadata))
+        else:
+            stats['cache_hits'] += 1
         
         if warning:
             album_warnings.append(warning)
             
         if metadata:
-            metadata['filename'] = filename
-            count, hash_val = get_cover_art_info(filepath)
-            metadata['cover_art_count'] = count
-            metadata['cover_art_hash'] = hash_val
+            metadata.filename = filename
             files_metadata.append(metadata)
 
+    if fingerprint_covers:
+        fresh_ids = {id(md) for _, _, md in fresh_cache_entries}
+        hash_started = time.perf_counter()
+        rehashed = resolve_cover_hashes(dirpath, files_metadata)
+        stats['cover_hash_seconds'] += time.perf_counter() - hash_started
+        for md in rehashed:
+            if id(md) in fresh_ids or cache is None:
+                continue
+            try:
+                filepath = os.path.join(dirpath, md.filename)
+                fresh_cache_entries.append((filepath, os.stat(filepath), md))
+            except OSError:
+                continue
+
+    if cache is not None and fresh_cache_entries:
+        cache.put_many([
+            (filepath, stat, md.as_dict()) for filepath, stat, md in fresh_cache_entries
+        ])
+
     if not files_metadata:
         return None
 
-    album_tags = [md['album'] for md in files_metadata if md.get('album')]
+    album_tags = [md.album for md in files_metadata if md.album]
     if album_tags:
         most_common_album, _ = Counter(album_tags).most_common(1)[0]
-        years_for_album = [md.get('year') for md in files_metadata if md.get('album') == most_common_album and md.get('year')]
+        years_for_album = [md.year for md in files_metadata if md.album == most_common_album and md.year]
         year = Counter(years_for_album).most_common(1)[0][0] if years_for_album else None
     else:
         most_common_album = os.path.basename(dirpath)
         year = None
 
-    print(f"  -> Found album: '{most_common_album}'" + (f" ({year})" if year else ""))
+    log.detail(f"  -> Found album: '{most_common_album}'" + (f" ({year})" if year else ""),
+               'album_found', path=dirpath, album=most_common_album, year=year, tracks=len(files_metadata))
     
+    stats['seconds'] = time.perf_counter() - started
     return {
         'path': dirpath, 'album': most_common_album, 'year': year,
         'files_metadata': files_metadata,
         'has_images': any(f.lower().endswith(SUPPORTED_IMAGE_EXTENSIONS) for f in filenames),
-        'album_warnings': album_warnings
+        'album_warnings': album_warnings,
+        'stats': stats
     }
 
-def check_cover_art(files_metadata: List[Dict]) -> List[str]:
-    """Checks for issues with embedded cover art and returns general warning tags."""
-    warnings = set()
-    cover_hashes = set()
-    files_with_art = 0
-    total_files = len(files_metadata)
+def analyze_folders(tasks: List[Tuple[str, List[str]]], jobs: int = DEFAULT_JOBS, use_processes: bool = False,
+                    cache: Optional[ScanCache] = None, fingerprint_covers: bool = False,
+                    perceptual_covers: bool = False) -> List[Dict]:
+    """
+    Runs analyze_album_folder over (dirpath, filenames) tasks, optionally through a worker pool.
+    Results are returned in task order regardless of which worker finishes first.
+    """
+    analyze = partial(analyze_album_folder, cache=cache, fingerprint_covers=fingerprint_covers,
+                      perceptual_covers=perceptual_covers)
+    folder_info: List[Dict] = []
+    log.start_progress('Analyzing', len(tasks), 'folders')
+    try:
+        if jobs <= 1 or len(tasks) <= 1:
+            for dirpath, filenames in tasks:
+                info = analyze(dirpath, filenames)
+                if info: folder_info.append(info)
+                log.advance()
+        else:
+            if use_processes:
+                executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker_log,
+                                               initargs=(log.verbosity, log.log_path))
+            else:
+                executor = ThreadPoolExecutor(max_workers=jobs)
+            dirpaths = [dirpath for dirpath, _ in tasks]
+            filename_lists = [filenames for _, filenames in tasks]
+            with executor:
+                for info in executor.map(analyze, dirpaths, filename_lists, chunksize=PROCESS_POOL_CHUNKSIZE):
+                    if info: folder_info.append(info)
+                    log.advance()
+    finally:
+        log.end_progress()
+    return folder_info
 
-    for md in files_metadata:
-        count = md.get('cover_art_count', 0)
-        hash_val = md.get('cover_art_hash')
+def count_cover_clusters(phashes: List[str], max_distance: int) -> int:
+    """Counts groups of perceptual hashes that are chained together within max_distance."""
+    values = [int(phash, 16) for phash in phashes]
+    parents = list(range(len(values)))
 
-        if count > 1:
-            warnings.add("[Multiple Covers]")
-        
-        if hash_val:
-            cover_hashes.add(hash_val)
-            files_with_art += 1
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
 
-    if len(cover_hashes) > 1:
-        warnings.add("[Inconsistent Covers]")
+    for i in range(len(values)):
+        for j in range(i + 1, len(values)):
+            if hamming_distance(values[i], values[j]) <= max_distance:
+                parents[find(i)] = find(j)
+    return len({find(i) for i in range(len(values))})
 
-    if files_with_art < total_files:
-        warnings.add("[Missing Cover]")
-        
-    return sorted(list(warnings))
+def _parse_track_number(track: Optional[str]) -> Optional[int]:
+    """Parses '3' or '3/12' into 3, or returns None for a missing or unparseable track number."""
+    if not track:
+        return None
+    try:
+        if '/' in str(track):
+            track = str(track).split('/')[0]
+        return int(track)
+    except (ValueError, TypeError):
+        return None
 
-def check_track_gaps(files_metadata: List[Dict]) -> List[str]:
-    """Checks for gaps in track numbers and returns general warning tags."""
+def check_album(info: Dict, max_distance: Optional[int] = None) -> Tuple[List[str], bool]:
+    """
+    Runs every consistency check on one album in a single pass over its tracks and returns
+    (warning_tags, has_redundant_disc). With max_distance set, covers whose perceptual hashes are that
+    close count as the same image and are reported as [Near-Duplicate Covers] instead of [Inconsistent Covers].
+    """
+    files_metadata = info['files_metadata']
     warnings = set()
-    tracks_by_disc: Dict[str, List[int]] = {}
+    phashes_by_cover: Dict[str, Optional[str]] = {}
+    tracks_by_disc: Dict[str, set] = {}
+    track_disc_pairs: Counter = Counter()
+    album_tags, discs = set(), set()
+    files_with_art = 0
 
     for md in files_metadata:
-        track_str = md.get('track')
-        disc_str = md.get('disc') or '1'
-        
-        if track_str:
-            try:
-                if '/' in str(track_str):
-                    track_str = str(track_str).split('/')[0]
-                track_num = int(track_str)
-                
-                if disc_str not in tracks_by_disc:
-                    tracks_by_disc[disc_str] = []
-                tracks_by_disc[disc_str].append(track_num)
-            except (ValueError, TypeError):
-                continue
+        track, disc = md.track, md.disc
+        if not md.title: warnings.add("[Missing Title]")
+        if not md.artist: warnings.add("[Missing Artist]")
+        if not md.album: warnings.add("[Missing Album]")
+        if not md.albumartist: warnings.add("[Missing Album Artist]")
+        if track == '0' or disc == '0': warnings.add("[Zero Metadata]")
+        if md.invalid_year_tag: warnings.add("[Invalid Year]")
+        if md.cover_art_count > 1: warnings.add("[Multiple Covers]")
 
-    for disc, tracks in sorted(tracks_by_disc.items()):
-        if not tracks:
-            continue
-            
-        sorted_tracks = sorted(list(set(tracks)))
-        
-        if sorted_tracks[0] != 1:
+        discs.add(disc)
+        if md.album:
+            album_tags.add(md.album)
+        cover = md.cover_art_hash or md.cover_art_fingerprint
+        if cover:
+            files_with_art += 1
+            phashes_by_cover[cover] = md.cover_art_phash
+        track_number = _parse_track_number(track)
+        if track_number is not None:
+            tracks_by_disc.setdefault(disc or '1', set()).add(track_number)
+        if track:
+            track_disc_pairs[(track, disc)] += 1
+
+    for tracks in tracks_by_disc.values():
+        first, last = min(tracks), max(tracks)
+        if first != 1:
             warnings.add("[Track Numbering Start]")
-        
-        expected_tracks = list(range(sorted_tracks[0], sorted_tracks[-1] + 1))
-        missing_tracks = set(expected_tracks) - set(sorted_tracks)
-        
-        if missing_tracks:
+        if last - first + 1 != len(tracks):
             warnings.add("[Track Gap]")
+    if any(count > 1 for count in track_disc_pairs.values()):
+        warnings.add("[Duplicate Track]")
+    if not info['has_images']:
+        warnings.add("[No Image]")
 
-    return sorted(list(warnings))
-
-def check_missing_tags(files_metadata: List[Dict]) -> List[str]:
-    """Checks for missing essential metadata tags."""
-    warnings = set()
-    for md in files_metadata:
-        if not md.get('title'):
-            warnings.add("[Missing Title]")
-        if not md.get('artist'):
-            warnings.add("[Missing Artist]")
-        if not md.get('album'):
-            warnings.add("[Missing Album]")
-        if not md.get('albumartist'):
-            warnings.add("[Missing Album Artist]")
-    return sorted(list(warnings))
-
-def check_inconsistent_album_tags(files_metadata: List[Dict]) -> List[str]:
-    """Checks for inconsistent album tags within the same folder."""
-    warnings = set()
-    album_tags = {md.get('album') for md in files_metadata if md.get('album')}
+    if len(phashes_by_cover) > 1:
+        phashes = list(phashes_by_cover.values())
+        if max_distance is not None and all(phashes) and count_cover_clusters(phashes, max_distance) == 1:
+            warnings.add("[Near-Duplicate Covers]")
+        else:
+            warnings.add("[Inconsistent Covers]")
+    if files_with_art < len(files_metadata):
+        warnings.add("[Missing Cover]")
     if len(album_tags) > 1:
         warnings.add("[Inconsistent Album]")
-    return sorted(list(warnings))
 
-def plan_file_renames(info: Dict, final_folder_name: str) -> List[Tuple[str, str]]:
-    """Creates a plan to rename files within a folder based on metadata."""
+    has_disc, has_no_disc = any(discs), None in discs
+    if has_disc and has_no_disc:
+        warnings.add("[Inconsistent Disc #]")
+    return sorted(warnings), has_disc and not has_no_disc and len(discs) == 1
+
+def check_albums(folder_info: List[Dict], max_distance: Optional[int] = None) -> List[Tuple[List[str], bool]]:
+    """Runs check_album on every album, returning the results in folder_info order."""
+    return [check_album(info, max_distance) for info in folder_info]
+
+def build_cover_index(folder_info: List[Dict]) -> BKTree:
+    """Indexes every distinct perceptual cover hash of every album by its position in folder_info."""
+    index = BKTree()
+    for album_index, info in enumerate(folder_info):
+        for phash in sorted({md.cover_art_phash for md in info['files_metadata'] if md.cover_art_phash}):
+            index.add(int(phash, 16), album_index)
+    return index
+
+def find_duplicate_covers(folder_info: List[Dict], max_distance: int) -> List[Tuple[int, int]]:
+    """Returns sorted (album_index, other_album_index) pairs whose covers are near-identical."""
+    index = build_cover_index(folder_info)
+    pairs = set()
+    for album_index, info in enumerate(folder_info):
+        for phash in {md.cover_art_phash for md in info['files_metadata'] if md.cover_art_phash}:
+            for _, other_index in index.query(int(phash, 16), max_distance):
+                if other_index != album_index:
+                    pairs.add((min(album_index, other_index), max(album_index, other_index)))
+    return sorted(pairs)
+
+def plan_file_renames(info: Dict, final_folder_name: str, without_disc: bool = False) -> List[Tuple[str, str]]:
+    """
+    Creates a plan to rename files within a folder based on metadata.
+    With without_disc, names are planned as if the files had no disc number (their disc tags are queued for removal).
+    """
     file_rename_plan = []
-    has_disc = any(md.get('disc') for md in info['files_metadata'])
-    has_no_disc = any(not md.get('disc') for md in info['files_metadata'])
+    has_disc = not without_disc and any(md.disc for md in info['files_metadata'])
+    has_no_disc = without_disc or any(not md.disc for md in info['files_metadata'])
     
     if has_disc and has_no_disc:
         return []
 
     proposed_new_filenames = set()
     for md in info['files_metadata']:
-        old_filename = md['filename']
-        track, title, artist = md.get('track'), md.get('title'), md.get('artist')
+        old_filename = md.filename
+        track, title, artist = md.track, md.title, md.artist
 
         if not track or not title:
             continue
 
         track_num = str(track).zfill(2)
-        disc_num = str(md.get('disc')) if has_disc else ''
+        disc_num = str(md.disc) if has_disc else ''
         _, ext = os.path.splitext(old_filename)
         
         s_title = sanitize_filename(title, is_path_component=True)
@@ -314,199 +1635,903 @@ def plan_file_renames(info: Dict, final_folder_name: str) -> List[Tuple[str, str
             
     return file_rename_plan
 
-def organize_music_folders(root_folder: str, check_only: bool = False, force_yes: bool = False, force_no: bool = False, folder_only: bool = False):
-    """Scans and organizes music folders and files."""
-    general_warnings: List[str] = []
-    warnings_by_album: Dict[str, List[str]] = {}
-    
-    if not os.path.isdir(root_folder):
-        print(f"Error: The specified folder does not exist: {root_folder}"); return
+RenameOperation = Tuple[str, str, str]
 
-    print("--- Phase 1: Analyzing Folders & Potential Names ---")
-    
-    root_folder = os.path.abspath(root_folder)
-    folder_info = [] 
+class RenameJournal:
+    """
+    Append-only JSON-lines journal of a Phase 3 rename plan.
+    Every planned (kind, old, new) operation is written and fsynced before the first rename.
+    Completed operations are then appended as 'done' records, flushed as they happen and
+    fsynced every JOURNAL_CHECKPOINT_OPS records, so an interrupted run can be resumed or rolled back
+    without rescanning any metadata. Operations that raise are appended as 'failed' records, and a
+    journal with failures is kept by finish() so the run can still be resumed or rolled back.
+    """
+
+    def __init__(self, path: str, operations: List[RenameOperation], done: set):
+        self.path = path
+        self.operations = operations
+        self.done = done
+        self._file = open(path, 'a', encoding='utf-8')
+        self._unsynced = 0
+        self.failed = 0
 
-    for dirpath, dirnames, filenames in os.walk(root_folder):
-        dirpath = os.path.abspath(dirpath)
-        if dirpath == root_folder: continue
+    @classmethod
+    def create(cls, path: str, operations: List[RenameOperation]) -> 'RenameJournal':
+        with open(path, 'x', encoding='utf-8') as f:
+            for seq, (kind, old_path, new_path) in enumerate(operations):
+                f.write(json.dumps({'op': 'plan', 'seq': seq, 'kind': kind, 'old': old_path, 'new': new_path}) + '\n')
+            f.write(json.dumps({'op': 'begin', 'count': len(operations)}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        return cls(path, operations, set())
 
-        is_true_container = False
-        if dirnames:
-            for subfolder_name in dirnames:
+    @classmethod
+    def load(cls, path: str) -> 'RenameJournal':
+        """Reads a journal back. A plan without its 'begin' record was never started and loads as empty."""
+        operations: List[RenameOperation] = []
+        done, began = set(), False
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
                 try:
-                    subfolder_path = os.path.join(dirpath, subfolder_name)
-                    if any(f.lower().endswith(SUPPORTED_EXTENSIONS) for f in os.listdir(subfolder_path)):
-                        is_true_container = True; break
-                except OSError: continue
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record['op'] == 'plan':
+                    operations.append((record['kind'], record['old'], record['new']))
+                elif record['op'] == 'begin':
+                    began = True
+                elif record['op'] == 'done':
+                    done.add(record['seq'])
+                elif record['op'] == 'undone':
+                    done.discard(record['seq'])
+        return cls(path, operations if began else [], done)
 
-        if is_true_container:
-            parent_name = os.path.basename(dirpath)
-            choice = 'n' if check_only or force_no else 'y' if force_yes else ''
-            if not choice:
-                try: choice = input(f"\nContainer folder '{parent_name}' found. Flatten? (y/n): ").lower()
-                except (EOFError, KeyboardInterrupt): print("\nCancelled."); choice = 'n'
-            
-            if choice == 'y':
-                if flatten_container_folder(dirpath, dirnames, general_warnings):
-                    dirnames[:], filenames = [], os.listdir(dirpath)
-                    info = analyze_album_folder(dirpath, filenames)
-                    if info: folder_info.append(info)
-                continue
+    def record(self, op: str, seq: int):
+        self._file.write(json.dumps({'op': op, 'seq': seq}) + '\n')
+        self._file.flush()
+        if op == 'done':
+            self.done.add(seq)
+        elif op == 'failed':
+            self.failed += 1
+        self._unsynced += 1
+        if self._unsynced >= JOURNAL_CHECKPOINT_OPS:
+            self.checkpoint()
+
+    def checkpoint(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def finish(self):
+        """Closes the journal once every operation has been attempted, deleting it unless one of them failed."""
+        self.checkpoint()
+        self._file.close()
+        if self.failed:
+            log.always(f"\n{self.failed} rename(s) failed; the journal was kept at '{self.path}'.")
+            log.always("Run again with --resume to retry them or --rollback to undo the run.")
+        else:
+            os.remove(self.path)
+
+def run_rename_operations(operations: List[RenameOperation], general_warnings: List[str], journal: Optional[RenameJournal] = None,
+                          index: Optional[DirectoryIndex] = None, cache: Optional[ScanCache] = None, resuming: bool = False):
+    """
+    Applies (kind, old_path, new_path) renames in order, skipping those the journal already has as done.
+    When resuming, an operation whose source is gone and whose target exists is treated as already applied.
+    Returns the number of operations applied.
+    """
+    current_kind = None
+    applied = 0
+    for seq, (kind, old_path, new_path) in enumerate(operations):
+        if journal is not None and seq in journal.done:
+            continue
+        if kind != current_kind:
+            log.end_progress()
+            current_kind = kind
+            log.info("\nStep 1: Renaming files..." if kind == 'file' else "\nStep 2: Renaming folders...")
+            log.start_progress('Renaming', sum(1 for op in operations[seq:] if op[0] == kind), f"{kind}s")
+        log.advance()
+        try:
+            if resuming and not os.path.lexists(old_path) and os.path.lexists(new_path):
+                log.detail(f"  Already renamed {kind}: '{os.path.basename(old_path)}' -> '{os.path.basename(new_path)}'",
+                           'rename', kind=kind, old=old_path, new=new_path, already_done=True)
             else:
-                general_warnings.append(f"[Container Folder] '{parent_name}' was skipped.")
-                dirnames[:]=[]
-                continue
-        
-        info = analyze_album_folder(dirpath, filenames)
-        if info: folder_info.append(info)
+                os.rename(old_path, new_path)
+                log.detail(f"  Renamed {kind}: '{os.path.basename(old_path)}' -> '{os.path.basename(new_path)}'",
+                           'rename', kind=kind, old=old_path, new=new_path)
+            if index is not None:
+                index.rename(old_path, new_path)
+            if cache is not None:
+                (cache.move if kind == 'file' else cache.move_tree)(old_path, new_path)
+            if journal is not None:
+                journal.record('done', seq)
+            applied += 1
+        except OSError as e:
+            general_warnings.append(f"[Error] Renaming {kind} '{os.path.basename(old_path)}': {e}")
+            if journal is not None:
+                journal.record('failed', seq)
+    log.end_progress()
+    return applied
+
+def rebase_pending_operations(journal: RenameJournal) -> List[RenameOperation]:
+    """
+    Returns the journal's operations with the paths of those not yet done moved along with the folder
+    renames that are, so a file rename that failed before its folder was renamed can still be retried.
+    """
+    moved = [(old_path, new_path) for seq, (kind, old_path, new_path) in enumerate(journal.operations)
+             if kind == 'folder' and seq in journal.done]
+    def rebase(path: str) -> str:
+        for old_path, new_path in moved:
+            if path.startswith(old_path + os.sep):
+                path = new_path + path[len(old_path):]
+        return path
+    return [operation if seq in journal.done else (operation[0], rebase(operation[1]), rebase(operation[2]))
+            for seq, operation in enumerate(journal.operations)]
+
+def rollback_rename_operations(journal: RenameJournal, general_warnings: List[str], cache: Optional[ScanCache] = None):
+    """Undoes every applied operation of a journal in reverse order."""
+    for seq in reversed(range(len(journal.operations))):
+        kind, old_path, new_path = journal.operations[seq]
+        if os.path.lexists(old_path) or not os.path.lexists(new_path):
+            continue
+        try:
+            os.rename(new_path, old_path)
+            log.detail(f"  Restored {kind}: '{os.path.basename(new_path)}' -> '{os.path.basename(old_path)}'",
+                       'restore', kind=kind, old=old_path, new=new_path)
+            if cache is not None:
+                (cache.move if kind == 'file' else cache.move_tree)(new_path, old_path)
+            journal.record('undone', seq)
+        except OSError as e:
+            general_warnings.append(f"[Error] Restoring {kind} '{os.path.basename(new_path)}': {e}")
+            journal.record('failed', seq)
+
+def recover_interrupted_run(journal_path: str, rollback: bool = False, cache: Optional[ScanCache] = None):
+    """Finishes, or with rollback undoes, the renames recorded in an interrupted run's journal."""
+    if not os.path.exists(journal_path):
+        log.always(f"No interrupted run found (no journal at '{journal_path}')."); return
+
+    journal = RenameJournal.load(journal_path)
+    general_warnings: List[str] = []
+    total = len(journal.operations)
+    if rollback:
+        log.info(f"--- Rolling back interrupted run ({len(journal.done)} of {total} renames recorded as done) ---")
+        rollback_rename_operations(journal, general_warnings, cache)
+    else:
+        log.info(f"--- Resuming interrupted run ({len(journal.done)} of {total} renames already done) ---")
+        run_rename_operations(rebase_pending_operations(journal), general_warnings, journal, cache=cache, resuming=True)
+    journal.finish()
+    log.always("\nRollback complete!" if rollback else "\nOrganization complete!")
+
+    if general_warnings:
+        log.always("\n--- Warnings & Errors Found ---")
+        for warning in sorted(general_warnings):
+            log.always(warning, 'warning')
+
+def plan_album(info: Dict, final_name: str, album_checks: Tuple[List[str], bool], tag_edits: List[TagEdit],
+               check_only: bool = False, folder_only: bool = False,
+               plan: Optional[PlanWriter] = None) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Combines one album's check_albums result with its scan warnings, queueing removal of redundant
+    disc tags into tag_edits unless only checking, and plans its file renames.
+    Returns (warning_tags, file_rename_plan).
+    """
+    check_warnings, has_redundant_disc = album_checks
+    current_warnings = list(info.get('album_warnings') or []) + check_warnings
+
+    removing_disc = has_redundant_disc and not (check_only or folder_only)
+    if removing_disc:
+        remove_redundant_disc_tags(info, final_name, tag_edits, plan)
+    elif has_redundant_disc:
+        current_warnings.append("[Redundant Disc #]")
+
+    planned_files: List[Tuple[str, str]] = []
+    if not folder_only:
+        if "[Track Gap]" in current_warnings or "[Duplicate Track]" in current_warnings:
+            log.detail(f"  -> Skipping file renames for '{final_name}' due to track gap or duplicate tracks.",
+                       'skip_file_renames', path=info['path'])
+        else:
+            planned_files = plan_file_renames(info, final_name, without_disc=removing_disc)
+            for old_f, new_f in planned_files:
+                log.detail(f"  Plan file: '{os.path.basename(old_f)}' -> '{os.path.basename(new_f)}'",
+                           'plan_file', old=old_f, new=new_f)
+
+    return sorted(list(set(current_warnings))), planned_files
+
+def read_process_io() -> Optional[Dict[str, int]]:
+    """Returns this process's bytes read and read syscalls from /proc/self/io, or None where unavailable."""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            counters = dict(line.split(': ') for line in f.read().splitlines())
+        return {'bytes_read': int(counters['rchar']), 'read_syscalls': int(counters['syscr'])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+def cpu_seconds() -> float:
+    """CPU time of this process and its finished children (worker processes), user plus system."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+class RunMetrics:
+    """
+    Instrumentation for one organize run: wall and CPU time per phase, process-wide I/O per phase
+    (from /proc/self/io, so reads done in --processes workers are not included), named counters,
+    and per-folder analysis timings taken from the 'stats' that analyze_album_folder returns.
+    Phases are sequential; enter_phase() closes the previous one.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.counters: Counter = Counter()
+        self.folder_seconds: List[Tuple[float, str]] = []
+        self._current: Optional[Tuple[str, float, float, Optional[Dict[str, int]]]] = None
+        self._started = time.perf_counter()
 
-    album_title_lower_counts = Counter(info['album'].lower() for info in folder_info if info['album'])
-    duplicate_lower_titles = {album_lower for album_lower, count in album_title_lower_counts.items() if count > 1}
+    def enter_phase(self, name: str):
+        self.end_phase()
+        self._current = (name, time.perf_counter(), cpu_seconds(), read_process_io())
+
+    def end_phase(self):
+        if self._current is None:
+            return
+        name, wall_started, cpu_started, io_before = self._current
+        phase = self.phases.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+        phase['wall_seconds'] += time.perf_counter() - wall_started
+        phase['cpu_seconds'] += cpu_seconds() - cpu_started
+        io_after = read_process_io()
+        if io_before and io_after:
+            for key in io_after:
+                phase[key] = phase.get(key, 0) + io_after[key] - io_before[key]
+        self._current = None
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def add_folder_stats(self, folder_info: List[Dict]):
+        for info in folder_info:
+            stats = info.get('stats') or {}
+            self.counters['folders_analyzed'] += 1
+            self.counters['files_parsed'] += stats.get('files_parsed', 0)
+            self.counters['cache_hits'] += stats.get('cache_hits', 0)
+            self.counters['parse_seconds'] += stats.get('parse_seconds', 0.0)
+            self.counters['cover_hash_seconds'] += stats.get('cover_hash_seconds', 0.0)
+            if 'seconds' in stats:
+                self.folder_seconds.append((stats['seconds'], info['path']))
+
+    def report(self, slowest: int = METRICS_SLOWEST_FOLDERS) -> Dict:
+        self.end_phase()
+        return {
+            'total_wall_seconds': time.perf_counter() - self._started,
+            'phases': self.phases,
+            'counters': dict(self.counters),
+            'slowest_folders': [{'path': path, 'seconds': seconds}
+                                for seconds, path in sorted(self.folder_seconds, reverse=True)[:slowest]],
+        }
+
+def print_metrics_summary(report: Dict):
+    log.always("\n--- Run Metrics ---")
+    log.always(f"{'Phase':<10} {'Wall (s)':>10} {'CPU (s)':>10} {'Read (MB)':>10}")
+    for name, phase in report['phases'].items():
+        read_mb = f"{phase['bytes_read'] / (1024 * 1024):.2f}" if 'bytes_read' in phase else '-'
+        log.always(f"{name:<10} {phase['wall_seconds']:>10.3f} {phase['cpu_seconds']:>10.3f} {read_mb:>10}")
+    log.always(f"{'total':<10} {report['total_wall_seconds']:>10.3f}")
+    log.always("Counters: " + ", ".join(
+        f"{name}={value:.3f}" if isinstance(value, float) else f"{name}={value}"
+        for name, value in sorted(report['counters'].items())))
+    if report['slowest_folders']:
+        log.always("Slowest folders:")
+        for folder in report['slowest_folders']:
+            log.always(f"  {folder['seconds']:.3f}s  {folder['path']}")
+
+def log_plan_summary(albums: int, folder_renames: int, file_renames: int, tag_edits: int):
+    log.info(f"Planned {folder_renames} folder renames, {file_renames} file renames and {tag_edits} tag edits "
+             f"across {albums} albums.", 'plan_summary', albums=albums, folder_renames=folder_renames,
+             file_renames=file_renames, tag_edits=tag_edits)
+
+def print_warnings(general_warnings: List[str], warnings_by_album: Dict[str, List[str]]):
+    if general_warnings or warnings_by_album:
+        log.always("\n--- Phase 4: Warnings & Errors Found ---")
+        for warning in sorted(general_warnings):
+            log.always(warning, 'warning')
+        for album_name, tags in sorted(warnings_by_album.items()):
+            tags_str = ", ".join(tags)
+            log.always(f"{tags_str} In '{album_name}'", 'album_warnings', album=album_name, tags=tags)
+
+def apply_plan(plan_path: str, journal_path: Optional[str] = None, cache: Optional[ScanCache] = None,
+               jobs: int = DEFAULT_JOBS):
+    """Executes a plan written with --plan-out without re-running the analysis."""
+    try:
+        plan = read_plan(plan_path)
+    except (OSError, ValueError) as e:
+        log.always(f"Error: Could not read plan: {e}"); return
+
+    journal_path = journal_path or os.path.join(plan['root'], JOURNAL_FILENAME)
+    if os.path.exists(journal_path):
+        log.always(f"Error: An interrupted run was found ('{journal_path}').")
+        log.always("Run again with --resume to finish it or --rollback to undo it."); return
+
+    general_warnings = list(plan['warning'])
+    log.info(f"--- Applying plan '{plan_path}' ---")
+    log.info(f"{len(plan['tag_edit'])} tag edits, {len(plan['file'])} file renames, {len(plan['folder'])} folder renames.")
+
+    tag_stats = apply_tag_edits(plan['tag_edit'], general_warnings, jobs=jobs, cache=cache)
+    file_rename_plan = drop_renames_after_failed_tag_edits(plan['file'], tag_stats['failed'], general_warnings)
+
+    folder_rename_plan = sorted(plan['folder'], key=lambda x: len(x[0]), reverse=True)
+    operations = [('file', old, new) for old, new in file_rename_plan] + [('folder', old, new) for old, new in folder_rename_plan]
+    if operations:
+        journal = RenameJournal.create(journal_path, operations)
+        run_rename_operations(operations, general_warnings, journal, cache=cache)
+        journal.finish()
+
+    log.always("\nOrganization complete!")
+    print_warnings(general_warnings, plan['album_warnings'])
+
+def organize_music_folders(root_folder: str, check_only: bool = False, force_yes: bool = False, force_no: bool = False, folder_only: bool = False,
+                           jobs: int = DEFAULT_JOBS, use_processes: bool = False, cache: Optional[ScanCache] = None,
+                           fingerprint_covers: bool = False, similar_covers: bool = False, journal_path: Optional[str] = None,
+                           plan_out: Optional[str] = None, metrics_out: Optional[str] = None):
+    """
+    Scans and organizes music folders and files.
+    With plan_out, the plan (including tag edits) is streamed to that file instead of being executed.
+    With metrics_out, per-phase timings and counters are written there as JSON and summarized at the end.
+    """
+    general_warnings: List[str] = []
+    warnings_by_album: Dict[str, List[str]] = {}
     
-    duplicate_album_titles = {info['album'] for info in folder_info if info['album'] and info['album'].lower() in duplicate_lower_titles}
+    if not os.path.isdir(root_folder):
+        log.always(f"Error: The specified folder does not exist: {root_folder}"); return
 
-    for info in folder_info:
-        info['base_name'] = sanitize_filename(info['album'])
-        if info['album'] in duplicate_album_titles and info['year']:
-            info['base_name'] = f"{info['base_name']} ({info['year']})"
+    journal_path = journal_path or os.path.join(root_folder, JOURNAL_FILENAME)
+    if not check_only and not plan_out and os.path.exists(journal_path):
+        log.always(f"Error: An interrupted run was found ('{journal_path}').")
+        log.always("Run again with --resume to finish it or --rollback to undo it."); return
 
-    potential_base_names = [info['base_name'] for info in folder_info]
-    base_name_counts = Counter(potential_base_names)
-    base_names_to_number = {name for name, count in base_name_counts.items() if count > 1}
+    log.info("--- Phase 1: Analyzing Folders & Potential Names ---")
+    
+    metrics = RunMetrics()
+    metrics.enter_phase('walk')
+    root_folder = os.path.abspath(root_folder)
+    index = DirectoryIndex(root_folder)
+    # A plan-only run never changes the library, so container folders are reported rather than flattened
+    analysis_tasks = collect_album_folders(index, general_warnings, check_only or bool(plan_out), force_yes, force_no)
+    metrics.count('scandir_calls', index.scandir_calls)
 
-    print("\n--- Phase 2: Planning Renames & Final Checks ---")
+    metrics.enter_phase('analyze')
+    folder_info = analyze_folders(analysis_tasks, jobs=jobs, use_processes=use_processes, cache=cache,
+                                  fingerprint_covers=fingerprint_covers, perceptual_covers=similar_covers)
+    metrics.add_folder_stats(folder_info)
+
+    metrics.enter_phase('plan')
+    log.info("\n--- Phase 2: Planning Renames & Final Checks ---")
     
     folder_rename_plan, file_rename_plan = [], []
-    proposed_new_paths = set()
-    numbering_counters = Counter()
+    tag_edits: List[TagEdit] = []
     folder_info.sort(key=lambda x: x['path'])
+    final_names = assign_album_folder_names(folder_info)
+    album_checks = check_albums(folder_info, COVER_SIMILARITY_MAX_DISTANCE if similar_covers else None)
+    names = AlbumNameIndex.from_directory_index(index, {os.path.dirname(info['path']) for info in folder_info})
+    plan = PlanWriter(plan_out, root_folder) if plan_out else None
 
-    for info in folder_info:
-        base_name = info['base_name']
-        final_name = f"{base_name} ({numbering_counters[base_name] + 1})" if base_name in base_names_to_number else base_name
-        if base_name in base_names_to_number: numbering_counters[base_name] += 1
-            
-        parent_dir = os.path.dirname(info['path'])
+    for info, final_name, checks in zip(folder_info, final_names, album_checks):
+        parent_dir, current_name = os.path.split(info['path'])
         final_path = os.path.join(parent_dir, final_name)
         
-        current_warnings = []
-        
-        if info.get('album_warnings'):
-            current_warnings.extend(info['album_warnings'])
-            
-        if not info['has_images']:
-            current_warnings.append("[No Image]")
-        
-        if any(md.get('track') == '0' or md.get('disc') == '0' for md in info['files_metadata']):
-            current_warnings.append("[Zero Metadata]")
-
-        if any(md.get('invalid_year_tag') for md in info['files_metadata']):
-            current_warnings.append("[Invalid Year]")
-        
-        current_warnings.extend(check_track_gaps(info['files_metadata']))
-        current_warnings.extend(check_cover_art(info['files_metadata']))
-        current_warnings.extend(check_missing_tags(info['files_metadata']))
-        current_warnings.extend(check_inconsistent_album_tags(info['files_metadata']))
-
-        all_discs = [md.get('disc') for md in info['files_metadata']]
-        has_disc, has_no_disc = any(d for d in all_discs), any(d is None for d in all_discs)
-
-        if has_disc and has_no_disc:
-            current_warnings.append("[Inconsistent Disc #]")
-        elif has_disc and not has_no_disc and len(set(all_discs)) == 1:
-            if check_only or folder_only:
-                current_warnings.append("[Redundant Disc #]")
-            else:
-                remove_redundant_disc_tags(info, final_name, general_warnings)
-        
-        track_disc_pairs = [(md.get('track'), md.get('disc')) for md in info['files_metadata'] if md.get('track')]
-        if any(count > 1 for count in Counter(track_disc_pairs).values()):
-            current_warnings.append("[Duplicate Track]")
-
-        if current_warnings:
-            warnings_by_album[final_name] = sorted(list(set(current_warnings)))
-
-        if not folder_only:
-            if "[Track Gap]" in current_warnings or "[Duplicate Track]" in current_warnings:
-                print(f"  -> Skipping file renames for '{final_name}' due to track gap or duplicate tracks.")
-            else:
-                planned_files = plan_file_renames(info, final_name)
-                if planned_files:
-                    file_rename_plan.extend(planned_files)
-                    for old_f, new_f in planned_files:
-                        print(f"  Plan file: '{os.path.basename(old_f)}' -> '{os.path.basename(new_f)}'")
+        album_warnings, planned_files = plan_album(info, final_name, checks, tag_edits, check_only, folder_only, plan)
+        if album_warnings:
+            warnings_by_album[final_name] = album_warnings
+            if plan: plan.write('album_warnings', album=final_name, tags=album_warnings)
+        file_rename_plan.extend(planned_files)
+        if plan:
+            for old_f, new_f in planned_files:
+                plan.write('file', old=old_f, new=new_f)
 
         is_being_renamed = info['path'] != final_path
         if is_being_renamed:
-            if os.path.isdir(parent_dir) and final_name in os.listdir(parent_dir) or final_path in proposed_new_paths:
-                general_warnings.append(f"[Conflict] Folder '{final_name}' already exists. Skipping rename for '{os.path.basename(info['path'])}'.")
+            if names.contains(parent_dir, final_name, own_name=current_name):
+                general_warnings.append(f"[Conflict] Folder '{final_name}' already exists. Skipping rename for '{current_name}'.")
                 continue
             folder_rename_plan.append((info['path'], final_path))
-            proposed_new_paths.add(final_path)
-            print(f"Plan folder: '{os.path.basename(info['path'])}' -> '{final_name}'")
+            names.add(parent_dir, final_name)
+            if plan: plan.write('folder', old=info['path'], new=final_path)
+            log.detail(f"Plan folder: '{current_name}' -> '{final_name}'", 'plan_folder', old=info['path'], new=final_path)
         else:
-            print(f"OK:   '{os.path.basename(info['path'])}' is already correct.")
+            log.detail(f"OK:   '{current_name}' is already correct.", 'folder_ok', path=info['path'])
+
+    if similar_covers:
+        for album_index, other_index in find_duplicate_covers(folder_info, COVER_SIMILARITY_MAX_DISTANCE):
+            general_warnings.append(f"[Duplicate Cover] '{final_names[album_index]}' and '{final_names[other_index]}' have near-identical cover art.")
+    log_plan_summary(len(folder_info), len(folder_rename_plan), len(file_rename_plan), len(tag_edits))
 
-    if not folder_rename_plan and not file_rename_plan and not general_warnings and not warnings_by_album:
-        print("\nScan complete. No changes needed.")
+    if plan:
+        for warning in general_warnings:
+            plan.write('warning', message=warning)
+        plan.close()
+
+    if not folder_rename_plan and not file_rename_plan and not tag_edits and not general_warnings and not warnings_by_album:
+        log.always("\nScan complete. No changes needed.")
+    elif plan:
+        log.always(f"\nPlan written to '{plan_out}'. No files or folders were changed.")
+        log.always(f"Run with --apply {plan_out} to execute it.")
     elif check_only:
-        print("\nCheck-only mode is active. No files or folders will be changed.")
-        print("Scan complete.")
+        log.always("\nCheck-only mode is active. No files or folders will be changed.")
+        log.always("Scan complete.")
     else:
-        print("\n--- Phase 3: Executing Changes ---")
+        log.info("\n--- Phase 3: Executing Changes ---")
+        metrics.enter_phase('tags')
+        tag_stats = apply_tag_edits(tag_edits, general_warnings, jobs=jobs, cache=cache)
+        metrics.count('tag_edits', tag_stats['updated'])
+        metrics.count('tag_edits_in_place', tag_stats['in_place'])
+        metrics.count('tag_bytes_rewritten', tag_stats['bytes_rewritten'])
+        clear_removed_disc_tags(folder_info, tag_edits, tag_stats['failed'])
+        file_rename_plan = drop_renames_after_failed_tag_edits(file_rename_plan, tag_stats['failed'], general_warnings)
         
-        if file_rename_plan:
-            print("\nStep 1: Renaming files...")
-            for old_path, new_path in file_rename_plan:
-                try:
-                    os.rename(old_path, new_path)
-                    print(f"  Renamed file: '{os.path.basename(old_path)}' -> '{os.path.basename(new_path)}'")
-                except OSError as e:
-                    general_warnings.append(f"[Error] Renaming file '{os.path.basename(old_path)}': {e}")
+        metrics.enter_phase('rename')
+        folder_rename_plan.sort(key=lambda x: len(x[0]), reverse=True)
+        operations = [('file', old, new) for old, new in file_rename_plan] + [('folder', old, new) for old, new in folder_rename_plan]
+        if operations:
+            journal = RenameJournal.create(journal_path, operations)
+            metrics.count('renames', run_rename_operations(operations, general_warnings, journal, index=index, cache=cache))
+            journal.finish()
+
+        log.always("\nOrganization complete!")
+
+    print_warnings(general_warnings, warnings_by_album)
+
+    if metrics_out:
+        report = metrics.report()
+        print_metrics_summary(report)
+        try:
+            with open(metrics_out, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            log.info(f"Metrics written to '{metrics_out}'.")
+        except OSError as e:
+            log.always(f"Error: Could not write metrics to '{metrics_out}': {e}")
+
+def folder_signature(dirpath: str) -> Optional[Tuple]:
+    """Returns the sorted (name, size, mtime_ns) of a folder's files, or None if it cannot be read."""
+    try:
+        with os.scandir(dirpath) as it:
+            entries = []
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_size, stat.st_mtime_ns))
+            return tuple(sorted(entries))
+    except OSError:
+        return None
+
+class LibraryWatcher:
+    """
+    Keeps a library organized as albums are added to it.
+    Changes are collected with inotify (or, without inotify_simple or with use_polling, by comparing
+    folder modification times every poll_interval seconds) and a top-level folder is only processed
+    once it has been quiet for debounce seconds. Each batch runs Phase 1 to 3 on the changed folders
+    alone. Album names follow assign_album_folder_names over the title and year of every album in the
+    library, read once at startup, so an album that now shares its title with a new one is renamed in
+    the same batch and a full run afterwards plans nothing; names are checked against an in-memory
+    AlbumNameIndex of the library. The startup read parses every album's tags, so the command line
+    only starts a watcher with a scan cache, which makes every start after the first one cheap.
+    Folders left untouched since the watcher last organized them are skipped by their file signature,
+    so the watcher's own renames and tag edits do not trigger another pass.
+    """
+
+    def __init__(self, root_folder: str, check_only: bool = False, force_yes: bool = False, folder_only: bool = False,
+                 jobs: int = DEFAULT_JOBS, use_processes: bool = False, cache: Optional[ScanCache] = None,
+                 fingerprint_covers: bool = False, similar_covers: bool = False, journal_path: Optional[str] = None,
+                 debounce: float = WATCH_DEBOUNCE_SECONDS, poll_interval: float = WATCH_POLL_INTERVAL_SECONDS,
+                 use_polling: bool = False):
+        self.root = os.path.abspath(root_folder)
+        self.check_only, self.force_yes, self.folder_only = check_only, force_yes, folder_only
+        self.jobs, self.use_processes, self.cache = jobs, use_processes, cache
+        self.fingerprint_covers, self.similar_covers = fingerprint_covers, similar_covers
+        self.journal_path = journal_path or os.path.join(self.root, JOURNAL_FILENAME)
+        self.debounce, self.poll_interval = debounce, poll_interval
 
-        if folder_rename_plan:
-            print("\nStep 2: Renaming folders...")
+        index = DirectoryIndex(self.root)
+        self.albums: Dict[str, Dict] = {}
+        self._index_albums(index)
+        self.names = AlbumNameIndex.from_directory_index(index, {os.path.dirname(path) for path in self.albums})
+        self.pending: Dict[str, float] = {}
+        self.known_signatures: Dict[str, Tuple] = {}
+        self.watch_paths: Dict[int, str] = {}
+        self.inotify = None
+        if inotify_available and not use_polling:
+            self.inotify = INotify()
+            self.watch_mask = (inotify_flags.CREATE | inotify_flags.CLOSE_WRITE | inotify_flags.ATTRIB |
+                               inotify_flags.DELETE | inotify_flags.MOVED_FROM | inotify_flags.MOVED_TO)
+            for dirpath, _, _ in index.walk():
+                self._add_watch(dirpath)
+        else:
+            self.dir_mtimes = self._snapshot_dir_mtimes()
+
+    def _index_albums(self, index: DirectoryIndex):
+        """
+        Reads the title and year of every album in the library, as a full run would see them. Covers are
+        read the same way as in process_folders, so both passes share the scan cache's entries.
+        """
+        log.info(f"--- Reading album titles in '{self.root}' ---")
+        tasks = collect_album_folders(index, [], check_only=True)
+        for info in analyze_folders(tasks, jobs=self.jobs, use_processes=self.use_processes, cache=self.cache,
+                                    fingerprint_covers=self.fingerprint_covers, perceptual_covers=self.similar_covers):
+            self._remember_album(info['path'], info)
+
+    def _remember_album(self, path: str, info: Dict):
+        self.albums[path] = {'path': path, 'album': info['album'], 'year': info['year']}
+
+    def _planned_names(self) -> Dict[str, str]:
+        """Maps each known album folder to the name a full run would give it."""
+        albums = sorted(self.albums.values(), key=lambda x: x['path'])
+        return dict(zip((album['path'] for album in albums), assign_album_folder_names(albums)))
+
+    def _add_watch(self, dirpath: str):
+        try:
+            self.watch_paths[self.inotify.add_watch(dirpath, self.watch_mask)] = dirpath
+        except OSError:
+            pass
+
+    def _top_level_folder(self, path: str) -> Optional[str]:
+        """Maps a changed path to the folder directly under the root that contains it."""
+        relative = os.path.relpath(path, self.root)
+        if relative == os.curdir or relative.startswith(os.pardir):
+            return None
+        return os.path.join(self.root, relative.split(os.sep)[0])
+
+    def _mark_changed(self, path: str, now: float):
+        top = self._top_level_folder(path)
+        if top:
+            self.pending[top] = now
+
+    def _collect_inotify_events(self):
+        events = self.inotify.read(timeout=WATCH_READ_TIMEOUT_MS)
+        now = time.monotonic()
+        for event in events:
+            if event.mask & inotify_flags.Q_OVERFLOW:
+                log.info("[Watch] Event queue overflowed; rescanning every folder.")
+                for name in os.listdir(self.root):
+                    self._mark_changed(os.path.join(self.root, name), now)
+                continue
+            parent = self.watch_paths.get(event.wd)
+            if parent is None:
+                continue
+            if event.mask & inotify_flags.IGNORED:
+                del self.watch_paths[event.wd]
+                continue
+            path = os.path.join(parent, event.name) if event.name else parent
+            if event.mask & inotify_flags.ISDIR:
+                if event.mask & (inotify_flags.CREATE | inotify_flags.MOVED_TO):
+                    self.names.add(parent, event.name)
+                    for dirpath, _, _ in DirectoryIndex(path).walk():
+                        self._add_watch(dirpath)
+                elif event.mask & (inotify_flags.DELETE | inotify_flags.MOVED_FROM):
+                    self.names.remove(parent, event.name)
+                    self.known_signatures.pop(path, None)
+            self._mark_changed(path, now)
+
+    def _snapshot_dir_mtimes(self) -> Dict[str, int]:
+        mtimes: Dict[str, int] = {}
+        pending = [self.root]
+        while pending:
+            dirpath = pending.pop()
+            try:
+                mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+                with os.scandir(dirpath) as it:
+                    pending.extend(entry.path for entry in it if entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+        return mtimes
+
+    def _collect_polled_changes(self):
+        time.sleep(self.poll_interval)
+        mtimes = self._snapshot_dir_mtimes()
+        now = time.monotonic()
+        for dirpath in self.dir_mtimes.keys() - mtimes.keys():
+            self.names.remove(os.path.dirname(dirpath), os.path.basename(dirpath))
+            self.known_signatures.pop(dirpath, None)
+        for dirpath, mtime_ns in mtimes.items():
+            if dirpath not in self.dir_mtimes:
+                self.names.add(os.path.dirname(dirpath), os.path.basename(dirpath))
+                self._mark_changed(dirpath, now)
+            elif self.dir_mtimes[dirpath] != mtime_ns:
+                self._mark_changed(dirpath, now)
+        self.dir_mtimes = mtimes
+
+    def run(self):
+        if not self.check_only and os.path.exists(self.journal_path):
+            log.always(f"Error: An interrupted run was found ('{self.journal_path}').")
+            log.always("Run again with --resume to finish it or --rollback to undo it."); return
+
+        backend = "inotify" if self.inotify else f"polling every {self.poll_interval:g}s"
+        log.info(f"--- Watching '{self.root}' ({backend}, debounce {self.debounce:g}s). Press Ctrl+C to stop. ---")
+        try:
+            while True:
+                if self.inotify:
+                    self._collect_inotify_events()
+                else:
+                    self._collect_polled_changes()
+                now = time.monotonic()
+                settled = sorted(path for path, changed_at in self.pending.items() if now - changed_at >= self.debounce)
+                for path in settled:
+                    del self.pending[path]
+                if settled:
+                    self.process_folders(settled)
+        except KeyboardInterrupt:
+            log.info("\nStopped watching.")
+        finally:
+            if self.inotify:
+                self.inotify.close()
+
+    def process_folders(self, top_folders: List[str]):
+        """
+        Runs Phases 1 to 3 on the given top-level folders and prints their warnings. Albums elsewhere in
+        the library whose full-run name changes because of this batch (a new album sharing their title,
+        or the last one that did being removed) are analyzed and renamed along with them.
+        """
+        general_warnings: List[str] = []
+        warnings_by_album: Dict[str, List[str]] = {}
+
+        previous_names = self._planned_names()
+        removed = [path for path in self.albums
+                   if any(path == top or path.startswith(top + os.sep) for top in top_folders) and not os.path.isdir(path)]
+        for path in removed:
+            del self.albums[path]
+
+        analysis_tasks: List[Tuple[str, List[str]]] = []
+        for top in top_folders:
+            if not os.path.isdir(top):
+                continue
+            tasks = collect_album_folders(DirectoryIndex(top), general_warnings, self.check_only,
+                                          force_yes=self.force_yes, force_no=not self.force_yes, include_root=True)
+            analysis_tasks.extend((dirpath, filenames) for dirpath, filenames in tasks
+                                  if self.known_signatures.get(dirpath) != folder_signature(dirpath))
+        if not analysis_tasks and not removed and not general_warnings:
+            return
+
+        log.info(f"\n--- Change detected in {len(top_folders)} folder(s) ---")
+        folder_info = analyze_folders(analysis_tasks, jobs=self.jobs, use_processes=self.use_processes, cache=self.cache,
+                                      fingerprint_covers=self.fingerprint_covers, perceptual_covers=self.similar_covers)
+        for dirpath, _ in analysis_tasks:
+            self.albums.pop(dirpath, None)
+        for info in folder_info:
+            self._remember_album(info['path'], info)
+
+        analyzed = {info['path'] for info in folder_info}
+        sibling_tasks: List[Tuple[str, List[str]]] = []
+        for path, name in self._planned_names().items():
+            if path not in analyzed and previous_names.get(path) != name:
+                try: sibling_tasks.append((path, os.listdir(path)))
+                except OSError: continue
+        if sibling_tasks:
+            log.info(f"  -> {len(sibling_tasks)} existing album(s) share a title with this change and will be renamed too.")
+            for info in analyze_folders(sibling_tasks, jobs=self.jobs, use_processes=self.use_processes, cache=self.cache,
+                                        fingerprint_covers=self.fingerprint_covers, perceptual_covers=self.similar_covers):
+                self._remember_album(info['path'], info)
+                folder_info.append(info)
+        planned_names = self._planned_names()
+
+        folder_rename_plan, file_rename_plan = [], []
+        tag_edits: List[TagEdit] = []
+        final_paths: Dict[str, str] = {}
+        folder_info.sort(key=lambda x: x['path'])
+        for parent_dir in {os.path.dirname(info['path']) for info in folder_info}:
+            if not self.names.indexes(parent_dir):
+                try: self.names.add_parent(parent_dir, os.listdir(parent_dir))
+                except OSError: continue
+        album_checks = check_albums(folder_info, COVER_SIMILARITY_MAX_DISTANCE if self.similar_covers else None)
+        for info, checks in zip(folder_info, album_checks):
+            parent_dir, current_name = os.path.split(info['path'])
+            final_name = planned_names[info['path']]
+            final_path = os.path.join(parent_dir, final_name)
+
+            album_warnings, planned_files = plan_album(info, final_name, checks, tag_edits, self.check_only, self.folder_only)
+            if album_warnings:
+                warnings_by_album[final_name] = album_warnings
+            file_rename_plan.extend(planned_files)
+
+            if info['path'] == final_path:
+                log.detail(f"OK:   '{current_name}' is already correct.", 'folder_ok', path=info['path'])
+            elif self.names.contains(parent_dir, final_name, own_name=current_name):
+                general_warnings.append(f"[Conflict] Folder '{final_name}' already exists. Skipping rename for '{current_name}'.")
+                final_path = info['path']
+            else:
+                folder_rename_plan.append((info['path'], final_path))
+                self.names.add(parent_dir, final_name)
+                log.detail(f"Plan folder: '{current_name}' -> '{final_name}'", 'plan_folder', old=info['path'], new=final_path)
+            final_paths[info['path']] = final_path
+        log_plan_summary(len(folder_info), len(folder_rename_plan), len(file_rename_plan), len(tag_edits))
+
+        if not self.check_only:
+            tag_stats = apply_tag_edits(tag_edits, general_warnings, jobs=self.jobs, cache=self.cache)
+            clear_removed_disc_tags(folder_info, tag_edits, tag_stats['failed'])
+            file_rename_plan = drop_renames_after_failed_tag_edits(file_rename_plan, tag_stats['failed'], general_warnings)
             folder_rename_plan.sort(key=lambda x: len(x[0]), reverse=True)
-            for old_path, new_path in folder_rename_plan:
-                try:
-                    os.rename(old_path, new_path)
-                    print(f"  Renamed folder: '{os.path.basename(old_path)}' -> '{os.path.basename(new_path)}'")
-                except OSError as e:
-                    general_warnings.append(f"[Error] Renaming folder '{os.path.basename(old_path)}': {e}")
+            operations = [('file', old, new) for old, new in file_rename_plan] + [('folder', old, new) for old, new in folder_rename_plan]
+            if operations and os.path.exists(self.journal_path):
+                general_warnings.append(f"[Error] Skipped {len(operations)} renames: a failed batch left its journal at "
+                                        f"'{self.journal_path}'. Run with --resume or --rollback.")
+            elif operations:
+                journal = RenameJournal.create(self.journal_path, operations)
+                run_rename_operations(operations, general_warnings, journal, cache=self.cache)
+                journal.finish()
 
-        print("\nOrganization complete!")
+        for old_path, final_path in final_paths.items():
+            settled_path = final_path if os.path.isdir(final_path) and not os.path.lexists(old_path) else old_path
+            if final_path != old_path:
+                parent_dir = os.path.dirname(old_path)
+                self.names.remove(parent_dir, os.path.basename(old_path if settled_path == final_path else final_path))
+                self.names.add(parent_dir, os.path.basename(settled_path))
+            self._remember_album(settled_path, self.albums.pop(old_path))
+            self.known_signatures.pop(old_path, None)
+            self.known_signatures[settled_path] = folder_signature(settled_path)
+        for dirpath, _ in analysis_tasks:
+            if dirpath not in final_paths and os.path.isdir(dirpath):
+                self.known_signatures[dirpath] = folder_signature(dirpath)
 
-    if general_warnings or warnings_by_album:
-        print("\n--- Phase 4: Warnings & Errors Found ---")
-        for warning in sorted(general_warnings):
-            print(warning)
-        for album_name, tags in sorted(warnings_by_album.items()):
-            tags_str = ", ".join(tags)
-            print(f"{tags_str} In '{album_name}'")
+        print_warnings(general_warnings, warnings_by_album)
+
+def start_profiler(profile_path: str):
+    """Starts pyinstrument for an .html profile path, cProfile otherwise."""
+    if profile_path.endswith('.html'):
+        profiler = InstrumentProfiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+def save_profile(profiler, profile_path: str):
+    """Stops the profiler and writes an HTML report (pyinstrument) or a pstats file (cProfile)."""
+    try:
+        if profile_path.endswith('.html'):
+            profiler.stop()
+            with open(profile_path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        log.info(f"Profile written to '{profile_path}'.")
+    except OSError as e:
+        log.always(f"Error: Could not write profile to '{profile_path}': {e}")
+
+def pop_option_value(args: List[str], flags: List[str]) -> Optional[str]:
+    """Removes a '--flag value' or '--flag=value' option from args and returns its value."""
+    for i, arg in enumerate(args):
+        for flag in flags:
+            if arg == flag and i + 1 < len(args):
+                value = args[i + 1]
+                del args[i:i + 2]
+                return value
+            if arg.startswith(flag + '='):
+                del args[i]
+                return arg[len(flag) + 1:]
+    return None
 
 if __name__ == "__main__":
     args = sys.argv[1:]
     check_only_flags, force_yes_flags, force_no_flags = ['-c', '--check'], ['-y', '--force-yes'], ['-n', '--force-no']
     folder_only_flags = ['--folder-only']
+    process_flags = ['--processes']
+    fingerprint_flags = ['--fingerprint-covers']
+    similar_covers_flags = ['--similar-covers']
+    resume_flags, rollback_flags = ['--resume'], ['--rollback']
+    watch_flags, polling_flags = ['--watch'], ['--polling']
+    quiet_flags, verbose_flags = ['-q', '--quiet'], ['-v', '--verbose']
+
+    jobs_value = pop_option_value(args, ['-j', '--jobs'])
+    cache_path = pop_option_value(args, ['--cache'])
+    journal_path = pop_option_value(args, ['--journal'])
+    plan_out_path = pop_option_value(args, ['--plan-out'])
+    apply_path = pop_option_value(args, ['--apply'])
+    metrics_path = pop_option_value(args, ['--metrics'])
+    profile_path = pop_option_value(args, ['--profile'])
+    debounce_value = pop_option_value(args, ['--debounce'])
+    poll_interval_value = pop_option_value(args, ['--poll-interval'])
+    log_file_path = pop_option_value(args, ['--log-file'])
+    try:
+        jobs = max(1, int(jobs_value)) if jobs_value else DEFAULT_JOBS
+    except ValueError:
+        log.always(f"Error: Invalid value for --jobs: {jobs_value}"); sys.exit(1)
+    try:
+        debounce = max(0.0, float(debounce_value)) if debounce_value else WATCH_DEBOUNCE_SECONDS
+        poll_interval = max(0.1, float(poll_interval_value)) if poll_interval_value else WATCH_POLL_INTERVAL_SECONDS
+    except ValueError:
+        log.always("Error: Invalid value for --debounce or --poll-interval."); sys.exit(1)
     
     check_only_mode = any(flag in args for flag in check_only_flags)
     force_yes_mode = any(flag in args for flag in force_yes_flags)
     force_no_mode = any(flag in args for flag in force_no_flags)
     folder_only_mode = any(flag in args for flag in folder_only_flags)
+    use_processes_mode = any(flag in args for flag in process_flags)
+    fingerprint_covers_mode = any(flag in args for flag in fingerprint_flags)
+    similar_covers_mode = any(flag in args for flag in similar_covers_flags)
+    resume_mode = any(flag in args for flag in resume_flags)
+    rollback_mode = any(flag in args for flag in rollback_flags)
+    watch_mode = any(flag in args for flag in watch_flags)
+    polling_mode = any(flag in args for flag in polling_flags)
+    quiet_mode = any(flag in args for flag in quiet_flags)
+    verbose_mode = any(flag in args for flag in verbose_flags)
     
-    args = [arg for arg in args if arg not in check_only_flags + force_yes_flags + force_no_flags + folder_only_flags]
-    target_folder = args[0] if args else input("Enter path to music folder: ")
+    option_flags = (process_flags + fingerprint_flags + similar_covers_flags + resume_flags + rollback_flags + watch_flags +
+                    polling_flags + quiet_flags + verbose_flags)
+    args = [arg for arg in args if arg not in check_only_flags + force_yes_flags + force_no_flags + folder_only_flags + option_flags]
+    target_folder = args[0] if args else (None if apply_path else input("Enter path to music folder: "))
 
-    if check_only_mode: print(">>> Running in Check-Only Mode <<<")
-    if folder_only_mode: print(">>> Running in Folder-Only Mode (Files will not be renamed) <<<")
-    if force_yes_mode: print(">>> Forcing 'Yes' to all flatten prompts <<<")
-    if force_no_mode: print(">>> Forcing 'No' to all flatten prompts <<<")
-        
-    organize_music_folders(
-        target_folder, 
-        check_only=check_only_mode, 
-        force_yes=force_yes_mode, 
-        force_no=force_no_mode,
-        folder_only=folder_only_mode
-    )
\ No newline at end of file
+    try:
+        log.configure(LOG_QUIET if quiet_mode else LOG_VERBOSE if verbose_mode else LOG_NORMAL, log_file_path)
+    except OSError as e:
+        log.always(f"Error: Could not open log file '{log_file_path}': {e}"); sys.exit(1)
+
+    if check_only_mode: log.info(">>> Running in Check-Only Mode <<<")
+    if folder_only_mode: log.info(">>> Running in Folder-Only Mode (Files will not be renamed) <<<")
+    if force_yes_mode: log.info(">>> Forcing 'Yes' to all flatten prompts <<<")
+    if force_no_mode: log.info(">>> Forcing 'No' to all flatten prompts <<<")
+    if jobs > 1: log.info(f">>> Analyzing with {jobs} {'processes' if use_processes_mode else 'threads'} <<<")
+    if cache_path: log.info(f">>> Using scan cache '{cache_path}' <<<")
+    if fingerprint_covers_mode: log.info(">>> Fingerprinting cover art from sampled picture data <<<")
+    if similar_covers_mode:
+        if not pil_available:
+            log.always("Error: --similar-covers requires the 'Pillow' library.")
+            log.always("Please install it by running: pip install Pillow")
+            sys.exit(1)
+        log.info(">>> Comparing cover art perceptually across the library <<<")
+    if plan_out_path: log.info(f">>> Writing plan to '{plan_out_path}' instead of executing it <<<")
+    if metrics_path: log.info(f">>> Writing run metrics to '{metrics_path}' <<<")
+    if profile_path:
+        if profile_path.endswith('.html') and not pyinstrument_available:
+            log.always("Error: HTML profiles require the 'pyinstrument' library.")
+            log.always("Please install it by running: pip install pyinstrument")
+            sys.exit(1)
+        log.info(f">>> Profiling run to '{profile_path}' <<<")
+    if watch_mode:
+        if not cache_path:
+            log.always("Error: --watch requires --cache <file>.")
+            log.always("The watcher reads every album's tags when it starts; the scan cache keeps that cheap after the first run.")
+            sys.exit(1)
+        if not inotify_available and not polling_mode:
+            log.info("Note: 'inotify_simple' is not installed; falling back to polling (pip install inotify_simple).")
+        log.info(">>> Watching for new and changed album folders <<<")
+    if log_file_path: log.info(f">>> Logging every message to '{log_file_path}' <<<")
+
+    scan_cache = ScanCache(cache_path) if cache_path else None
+    profiler = start_profiler(profile_path) if profile_path else None
+    try:
+        if resume_mode or rollback_mode:
+            recover_interrupted_run(journal_path or os.path.join(target_folder, JOURNAL_FILENAME), rollback=rollback_mode, cache=scan_cache)
+        elif apply_path:
+            apply_plan(apply_path, journal_path=journal_path, cache=scan_cache, jobs=jobs)
+        elif watch_mode:
+            if not os.path.isdir(target_folder):
+                log.always(f"Error: The specified folder does not exist: {target_folder}")
+            else:
+                LibraryWatcher(
+                    target_folder,
+                    check_only=check_only_mode,
+                    force_yes=force_yes_mode,
+                    folder_only=folder_only_mode,
+                    jobs=jobs,
+                    use_processes=use_processes_mode,
+                    cache=scan_cache,
+                    fingerprint_covers=fingerprint_covers_mode,
+                    similar_covers=similar_covers_mode,
+                    journal_path=journal_path,
+                    debounce=debounce,
+                    poll_interval=poll_interval,
+                    use_polling=polling_mode
+                ).run()
+        else:
+            organize_music_folders(
+                target_folder, 
+                check_only=check_only_mode, 
+                force_yes=force_yes_mode, 
+                force_no=force_no_mode,
+                folder_only=folder_only_mode,
+                jobs=jobs,
+                use_processes=use_processes_mode,
+                cache=scan_cache,
+                fingerprint_covers=fingerprint_covers_mode,
+                similar_covers=similar_covers_mode,
+                journal_path=journal_path,
+                plan_out=plan_out_path,
+                metrics_out=metrics_path
+            )
+    finally:
+        if profiler is not None: save_profile(profiler, profile_path)
+        if scan_cache is not None: scan_cache.close()
\ No newline at end of file
@@ -0,0 +1,228 @@
+import os
+import re
+import struct
+from typing import BinaryIO, Dict, List, Mapping, NamedTuple
+
+from mutagen.easyid3 import EasyID3
+from mutagen.id3 import ID3NoHeaderError
+from mutagen.mp3 import MPEGInfo
+
+# --- Configuration ---
+MPEG_SYNC_PROBE_BYTES = 128 * 1024
+
+class ProbeError(Exception):
+    """Raised when a file's headers cannot be parsed."""
+
+class AudioProbe(NamedTuple):
+    """
+    What probe_file reads from a file's headers. `tags` maps lowercase keys to lists of values
+    (a dict for FLAC, the EasyID3 tag itself for MP3). `estimated` is True when the duration is
+    not exact: an MP3 without a Xing, Info or VBRI header (duration taken from the file size and
+    first frame's bitrate) or a FLAC file whose STREAMINFO leaves the sample count unset.
+    """
+    tags: Mapping[str, List[str]]
+    sample_rate: int
+    duration: float
+    estimated: bool
+
+# MPEG audio header tables, indexed by the header's version bits (3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5).
+MPEG_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+MPEG1_BITRATES = {
+    1: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+}
+MPEG2_BITRATES = {
+    1: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    3: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+LAME_VERSION = re.compile(rb'(?:LAME|L)(\d)\.(\d+)')
+
+FLAC_STREAMINFO, FLAC_VORBIS_COMMENT = 0, 4
+
+def probe_file(file_path: str, ext: str, read_stream: bool = True) -> AudioProbe:
+    """
+    Reads tags, sample rate and duration from a .flac or .mp3 file, opening it once and reading only
+    its headers. With read_stream=False, only the tags are read (sample_rate and duration are 0).
+    Raises ProbeError for unsupported or malformed files and MutagenError for unreadable ID3 tags.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if ext == '.flac':
+                return probe_flac(f)
+            if ext == '.mp3':
+                return probe_mp3(f, read_stream)
+    except OSError as e:
+        raise ProbeError(str(e))
+    raise ProbeError(f"Unsupported file type: {ext}")
+
+def skip_id3v2(f: BinaryIO) -> int:
+    """Seeks past any ID3v2 tags at the start of the file (some taggers stack several) and returns the offset."""
+    offset = 0
+    while True:
+        f.seek(offset)
+        header = f.read(10)
+        if len(header) < 10 or header[:3] != b'ID3':
+            f.seek(offset)
+            return offset
+        size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        offset += 10 + size + (10 if header[5] & 0x10 else 0)
+
+def probe_flac(f: BinaryIO) -> AudioProbe:
+    """Walks the FLAC metadata blocks, reading STREAMINFO and VORBIS_COMMENT and seeking past the rest."""
+    skip_id3v2(f)
+    if f.read(4) != b'fLaC':
+        raise ProbeError("Not a FLAC file")
+
+    tags: Dict[str, List[str]] = {}
+    sample_rate, total_samples = 0, 0
+    is_last = False
+    while not is_last:
+        header = f.read(4)
+        if len(header) < 4:
+            raise ProbeError("Truncated FLAC metadata")
+        is_last = bool(header[0] & 0x80)
+        block_type = header[0] & 0x7F
+        length = int.from_bytes(header[1:4], 'big')
+        if block_type == FLAC_STREAMINFO:
+            block = f.read(length)
+            if len(block) < 18:
+                raise ProbeError("Truncated STREAMINFO block")
+            packed = int.from_bytes(block[10:18], 'big')
+            sample_rate = packed >> 44
+            total_samples = packed & 0xFFFFFFFFF
+        elif block_type == FLAC_VORBIS_COMMENT:
+            tags = parse_vorbis_comment(f.read(length))
+        else:
+            f.seek(length, os.SEEK_CUR)
+
+    if not sample_rate:
+        raise ProbeError("FLAC file has no STREAMINFO block")
+    return AudioProbe(tags, sample_rate, total_samples / sample_rate, total_samples == 0)
+
+def parse_vorbis_comment(block: bytes) -> Dict[str, List[str]]:
+    """Parses a Vorbis comment block into {lowercase_key: [values]}."""
+    tags: Dict[str, List[str]] = {}
+    try:
+        vendor_length, = struct.unpack_from('<I', block, 0)
+        position = 4 + vendor_length
+        count, = struct.unpack_from('<I', block, position)
+        position += 4
+        for _ in range(count):
+            length, = struct.unpack_from('<I', block, position)
+            position += 4
+            comment = block[position:position + length].decode('utf-8', 'replace')
+            position += length
+            key, separator, value = comment.partition('=')
+            if separator:
+                tags.setdefault(key.lower(), []).append(value)
+    except struct.error:
+        raise ProbeError("Truncated Vorbis comment block")
+    return tags
+
+def probe_mp3(f: BinaryIO, read_stream: bool = True) -> AudioProbe:
+    """Reads the ID3 tag, then the first MPEG frame and its Xing/Info (with LAME) or VBRI header."""
+    try:
+        tags = EasyID3(f)
+    except ID3NoHeaderError:
+        tags = {}
+    if not read_stream:
+        return AudioProbe(tags, 0, 0.0, False)
+
+    audio_start = skip_id3v2(f)
+    data = f.read(MPEG_SYNC_PROBE_BYTES)
+    file_size = os.fstat(f.fileno()).st_size
+    try:
+        sample_rate, duration, estimated = _probe_mpeg_frames(data, audio_start, file_size)
+    except ProbeError:
+        # No two consecutive frames near the start; let mutagen search further into the file.
+        f.seek(0)
+        try:
+            info = MPEGInfo(f)
+        except Exception as e:
+            raise ProbeError(f"No MPEG audio frames found: {e}")
+        return AudioProbe(tags, info.sample_rate, info.length, True)
+    return AudioProbe(tags, sample_rate, duration, estimated)
+
+def _parse_mpeg_header(data: bytes, position: int):
+    """Returns (version_bits, layer, sample_rate, bitrate, samples_per_frame, frame_length, mono) or None."""
+    if position + 4 > len(data):
+        return None
+    header = int.from_bytes(data[position:position + 4], 'big')
+    if header >> 21 != 0x7FF:
+        return None
+    version_bits = (header >> 19) & 3
+    layer = 4 - ((header >> 17) & 3)
+    bitrate_index = (header >> 12) & 0xF
+    rate_index = (header >> 10) & 3
+    if version_bits == 1 or layer == 4 or rate_index == 3 or bitrate_index in (0, 0xF):
+        return None
+    padding = (header >> 9) & 1
+    mono = ((header >> 6) & 3) == 3
+
+    bitrates = MPEG1_BITRATES if version_bits == 3 else MPEG2_BITRATES
+    bitrate = bitrates[layer][bitrate_index] * 1000
+    sample_rate = MPEG_SAMPLE_RATES[version_bits][rate_index]
+    if layer == 1:
+        samples_per_frame, slot = 384, 4
+    elif layer == 3 and version_bits != 3:
+        samples_per_frame, slot = 576, 1
+    else:
+        samples_per_frame, slot = 1152, 1
+    # Layer I counts the frame in 4-byte slots: (12 * bitrate / sample_rate + padding) * 4
+    frame_length = ((samples_per_frame // 8 // slot * bitrate) // sample_rate + padding) * slot
+    return version_bits, layer, sample_rate, bitrate, samples_per_frame, frame_length, mono
+
+def _probe_mpeg_frames(data: bytes, audio_start: int, file_size: int):
+    """
+    Finds the first frame in data (which starts at audio_start in the file) that either carries a VBR header
+    or is followed by a second valid frame, and returns (sample_rate, duration, estimated).
+    Durations follow mutagen: Xing frame counts minus LAME encoder delay and padding, VBRI frame counts,
+    and otherwise the stream size divided by the first frame's bitrate.
+    """
+    position = data.find(b'\xff')
+    while 0 <= position < len(data) - 4:
+        frame = _parse_mpeg_header(data, position)
+        if frame is not None:
+            version_bits, layer, sample_rate, bitrate, samples_per_frame, frame_length, mono = frame
+            if layer == 3:
+                vbr = _read_vbr_header(data, position, version_bits, mono, samples_per_frame)
+                if vbr is not None:
+                    return sample_rate, max(vbr, 0) / sample_rate, False
+            if _parse_mpeg_header(data, position + frame_length) is not None:
+                content_size = file_size - (audio_start + position)
+                return sample_rate, 8 * content_size / bitrate, True
+        position = data.find(b'\xff', position + 1)
+    raise ProbeError("No MPEG frame sync found")
+
+def _read_vbr_header(data: bytes, frame_start: int, version_bits: int, mono: bool, samples_per_frame: int):
+    """Returns the sample count from a Xing/Info or VBRI header in the frame at frame_start, or None."""
+    if version_bits == 3:
+        xing_offset = 21 if mono else 36
+    else:
+        xing_offset = 13 if mono else 21
+    position = frame_start + xing_offset
+    if data[position:position + 4] in (b'Xing', b'Info') and position + 8 <= len(data):
+        flags = int.from_bytes(data[position + 4:position + 8], 'big')
+        position += 8
+        if not flags & 1:
+            return None
+        frames = int.from_bytes(data[position:position + 4], 'big')
+        samples = frames * samples_per_frame
+        position += 4 + (4 if flags & 2 else 0) + (100 if flags & 4 else 0) + (4 if flags & 8 else 0)
+        version = data[position:position + 20]
+        match = LAME_VERSION.match(version)
+        if match and len(version) == 20:
+            major, minor = int(match.group(1)), int(match.group(2))
+            if (major, minor) > (3, 90) or ((major, minor) == (3, 90) and version[9:10] != b'('):
+                delay_padding = int.from_bytes(data[position + 21:position + 24], 'big')
+                samples -= (delay_padding >> 12) + (delay_padding & 0xFFF)
+        return samples
+
+    position = frame_start + 36
+    if data[position:position + 4] == b'VBRI' and position + 26 <= len(data):
+        version, _, _, _, frames, _, _, toc_entry_size, _ = struct.unpack_from('>HHHIIHHHH', data, position + 4)
+        if version == 1 and toc_entry_size in (2, 4):
+            return frames * samples_per_frame
+    return None
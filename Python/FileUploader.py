@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import filedialog, ttk
 import os
 import requests
+from requests.adapters import HTTPAdapter
 import threading
 import queue
 import time
@@ -9,14 +10,26 @@ import subprocess
 import re
 import platform
 import json
+import random
 import tkinter.font
+import asyncio
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+# Async upload engine
+try:
+    import aiohttp
+    aiohttp_available = True
+except ImportError:
+    aiohttp_available = False
 
 # ========== CONFIGURE THESE VALUES ==========
 ACCOUNT_ID = ""
 API_KEY = ""
 CATBOX_USERHASH = ""
 MAX_RETRIES = 20
-RETRY_DELAY = 0.5  # seconds between retries
+RETRY_DELAY = 0.5  # seconds before the first retry, doubling with each further one
 # ============================================
 
 # Service size limits in bytes
@@ -27,29 +40,399 @@ SIZE_LIMITS = {
     'files.vc': 10 * 1024 * 1024 * 1024   # 10GB
 }
 
+# Uploads each service runs at once; every service has its own pipeline, so a file goes to all of them in parallel
+SERVICE_CONCURRENCY = {
+    'files.vc': 4,
+    'fileditch': 4,
+    'lain.la': 2,
+    'catbox': 4
+}
+
+# Keep-alive connections each service's session holds open, reused across files and retries
+# (lain.la uploads through its own CLI, and fileditch through curl on Windows, so they don't use one)
+SERVICE_POOL_SIZE = {
+    'files.vc': 4,
+    'fileditch': 4,
+    'catbox': 4
+}
+
+# Uploads each service runs at once with the async engine, where an upload is a coroutine rather than a thread
+ASYNC_SERVICE_CONCURRENCY = {
+    'files.vc': 64,
+    'fileditch': 64,
+    'lain.la': 8,
+    'catbox': 64
+}
+
+# Backoff between retries is capped at RETRY_MAX_DELAY; a server's Retry-After is honored up to RETRY_AFTER_MAX
+RETRY_MAX_DELAY = 60  # seconds
+RETRY_AFTER_MAX = 600  # seconds
+# After BREAKER_FAILURE_THRESHOLD failed attempts in a row, all uploads to a service pause for BREAKER_COOLDOWN
+# seconds; then a single attempt probes the service before the others resume
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 30  # seconds
+BREAKER_POLL_INTERVAL = 1  # seconds between checks of a paused service
+
+# Order of the links in a consolidated line
+CONSOLIDATED_ORDER = ['lain.la', 'catbox', 'fileditch', 'files.vc']
+
+# Most log messages moved from the upload workers to the output panes per GUI refresh
+UI_BATCH_MAX = 2000
+
+FILESVC_UPLOAD_URL = 'https://api.files.vc/upload'
+FILEDITCH_UPLOAD_URL = 'https://up1.fileditch.com/upload.php'
+CATBOX_UPLOAD_URL = 'https://catbox.moe/user/api.php'
+
+# None of the services accepts ranged or chunked uploads, so a failed attempt restarts the whole file from
+# byte 0; files of at least LARGE_FILE_SIZE are retried at most LARGE_FILE_MAX_RETRIES times instead of MAX_RETRIES
+LARGE_FILE_SIZE = 100 * 1024 * 1024   # 100MB
+LARGE_FILE_MAX_RETRIES = 3
+
+def retry_limit(file_path):
+    """Whole-file retries allowed for an upload: fewer for large files, which restart from the beginning."""
+    try:
+        return LARGE_FILE_MAX_RETRIES if os.path.getsize(file_path) >= LARGE_FILE_SIZE else MAX_RETRIES
+    except OSError:
+        return MAX_RETRIES
+
+def filesvc_link(data):
+    debug_info = data.get('debug_info', {})
+    return f"https://files.vc/d/dl?hash={debug_info.get('hash', '')}"
+
+def fileditch_curl_command(wsl_path):
+    """The curl upload run through WSL on Windows, where requests uploads to fileditch fail."""
+    return ['wsl', 'curl', '-sS', '-H', 'Expect:', '-F', f'files[]=@"{wsl_path}"', FILEDITCH_UPLOAD_URL]
+
+def fileditch_link(raw_response):
+    """Returns the file URL from a fileditch response, which may start with HTTP headers when it comes from curl."""
+    try:
+        raw_response = raw_response.encode('utf-8', 'replace').decode('utf-8', 'replace')
+    except AttributeError:
+        pass
+
+    if raw_response.startswith('HTTP/'):
+        try:
+            headers, body = raw_response.split('\n\n', 1)
+            raw_response = body
+        except ValueError:
+            pass
+
+    try:
+        response_data = json.loads(raw_response)
+    except json.JSONDecodeError:
+        raise ValueError(f"JSON parsing failed. First 500 chars: {raw_response[:500]}...")
+
+    if response_data.get('success') and response_data.get('files'):
+        first_file = response_data['files'][0]
+        return first_file['url'].replace('\\/', '/')
+    raise ValueError("Invalid response structure")
+
+def lainla_link(output):
+    url_match = re.search(r'https?://[^\s]+', output)
+    if not url_match:
+        raise ValueError("No URL found in output")
+    return url_match.group()
+
+def retry_after_seconds(error):
+    """Returns the delay a failed request's Retry-After header asks for (seconds or an HTTP date), or None."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or getattr(error, 'headers', None)
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+# curl exit codes for failures to resolve, connect, time out, or send/receive data
+CURL_TRANSPORT_EXIT_CODES = {6, 7, 28, 52, 55, 56}
+
+def is_service_failure(error):
+    """
+    True if a failed attempt says the service itself is unavailable: a connection error, a timeout, or a
+    429 or 5xx response. Other errors (a malformed response, an unreadable file) are specific to the
+    file and don't count against the service's circuit breaker.
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError)):
+        return True
+    if aiohttp_available and isinstance(error, aiohttp.ClientConnectionError):
+        return True
+    if isinstance(error, subprocess.CalledProcessError):
+        command = error.cmd if isinstance(error.cmd, (list, tuple)) else [error.cmd]
+        return 'curl' in command and error.returncode in CURL_TRANSPORT_EXIT_CODES
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status', None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter: the delay before retry n is a random time between half and all of
+    base_delay * 2**n, capped at max_delay, so workers that failed together don't retry together.
+    A Retry-After from the server takes precedence, up to retry_after_max.
+    """
+    def __init__(self, base_delay=RETRY_DELAY, max_delay=RETRY_MAX_DELAY, retry_after_max=RETRY_AFTER_MAX):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_after_max = retry_after_max
+
+    def delay(self, attempt, error=None):
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(retry_after, self.retry_after_max)
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+class CircuitBreaker:
+    """
+    Pauses every upload to a service after failure_threshold failed attempts in a row. Once the cooldown
+    has passed, the next attempt is let through alone as a probe: if it succeeds uploads resume, otherwise
+    the service is paused for another cooldown. Shared by the threads and coroutines of both engines.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.reopen_at = 0.0
+
+    def wait_time(self):
+        """
+        Returns 0 if an attempt may start now, otherwise how long to wait before asking again. The first
+        caller after the cooldown gets 0 and becomes the probe.
+        """
+        with self.lock:
+            if self.state == self.CLOSED:
+                return 0
+            if self.state == self.OPEN:
+                remaining = self.reopen_at - time.monotonic()
+                if remaining > 0:
+                    return min(remaining, BREAKER_POLL_INTERVAL)
+                self.state = self.HALF_OPEN
+                return 0
+            return BREAKER_POLL_INTERVAL
+
+    def record_success(self):
+        """Closes the breaker; returns True if it was open or probing."""
+        with self.lock:
+            was_paused = self.state != self.CLOSED
+            self.state = self.CLOSED
+            self.failures = 0
+            return was_paused
+
+    def record_failure(self, pause=0):
+        """
+        Counts a failed attempt; returns True if it (re)opens the breaker, for at least `pause` seconds
+        (a Retry-After, capped at RETRY_AFTER_MAX). A failed probe always reopens it.
+        """
+        with self.lock:
+            self.failures += 1
+            if self.state == self.OPEN:
+                return False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.reopen_at = time.monotonic() + self.pause_length(pause)
+                return True
+            return False
+
+    def release_probe(self):
+        """Called when a probe failed for a reason unrelated to the service: the next attempt probes instead."""
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.reopen_at = time.monotonic()
+
+    def pause_length(self, pause=0):
+        return max(self.cooldown, min(pause, RETRY_AFTER_MAX))
+
+    def status(self):
+        """A short description of the state for the GUI."""
+        with self.lock:
+            if self.state == self.OPEN:
+                return f"Paused ({max(0, int(self.reopen_at - time.monotonic() + 0.999))}s)"
+            if self.state == self.HALF_OPEN:
+                return "Probing"
+            return f"OK ({self.failures} failing)" if self.failures else "OK"
+
+class PooledSession(requests.Session):
+    """A requests.Session shared by all upload threads of a service, pooling up to pool_size connections per host."""
+    def __init__(self, pool_size):
+        super().__init__()
+        # pool_block makes extra threads wait for a free connection instead of opening throwaway ones
+        self.adapter = HTTPAdapter(pool_maxsize=pool_size, pool_block=True)
+        self.mount('https://', self.adapter)
+        self.mount('http://', self.adapter)
+
+    def connection_stats(self):
+        """Returns (requests_sent, connections_opened) over every host the session has talked to."""
+        pools = self.adapter.poolmanager.pools
+        host_pools = [pool for pool in (pools.get(key) for key in pools.keys()) if pool is not None]
+        return sum(pool.num_requests for pool in host_pools), sum(pool.num_connections for pool in host_pools)
+
+class AsyncUploadEngine:
+    """
+    Uploads files as coroutines on an event loop in a background thread, as an alternative to a
+    thread per upload. Each service gets a semaphore of ASYNC_SERVICE_CONCURRENCY uploads and one
+    aiohttp session, file bodies are streamed from disk, and links, retries and errors are reported
+    through the app's UI queue just like the thread engine's.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        self.sessions = {}
+        self.stats = {}
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def upload_files(self, files, enabled_services, max_files):
+        """Uploads files to the enabled services, with up to max_files in flight, and blocks until all are done."""
+        asyncio.run_coroutine_threadsafe(
+            self._upload_files(files, enabled_services, max_files), self.loop
+        ).result()
+
+    def connection_stats(self, service):
+        """Returns (requests_sent, connections_opened) by the service's session."""
+        return tuple(self.stats.get(service, (0, 0)))
+
+    def close(self):
+        """Closes the sessions and stops the loop."""
+        async def close_sessions():
+            for session in self.sessions.values():
+                await session.close()
+
+        asyncio.run_coroutine_threadsafe(close_sessions(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _upload_files(self, files, enabled_services, max_files):
+        semaphores = {service: asyncio.Semaphore(ASYNC_SERVICE_CONCURRENCY[service]) for service in enabled_services}
+        file_slots = asyncio.Semaphore(max_files)
+
+        async def upload_file(file_path):
+            async with file_slots:
+                filename = os.path.basename(file_path)
+                targets = self.app.upload_targets(file_path, enabled_services)
+                await asyncio.gather(*(self._upload(service, file_path, semaphores[service]) for service in targets))
+                if targets:
+                    self.app.emit_consolidated_line(filename, enabled_services)
+
+        await asyncio.gather(*(upload_file(file_path) for file_path in files))
+
+    async def _upload(self, service, file_path, semaphore):
+        filename = os.path.basename(file_path)
+        async with semaphore:
+            breaker = self.app.breakers[service]
+            retries = retry_limit(file_path)
+            for attempt in range(retries + 1):
+                while (wait := breaker.wait_time()) > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    link = await self._upload_once(service, file_path)
+                except Exception as e:
+                    delay = self.app.report_attempt_failure(service, filename, attempt, e, retries)
+                    if delay is not None:
+                        await asyncio.sleep(delay)
+                else:
+                    self.app.record_link(service, filename, link)
+                    return
+
+    async def _upload_once(self, service, file_path):
+        filename = os.path.basename(file_path)
+        if service == 'lain.la':
+            return lainla_link(await self._run(['lain-upload', file_path]))
+        if service == 'fileditch' and platform.system() == "Windows":
+            wsl_path = (await self._run(['wsl', 'wslpath', '-a', file_path])).strip()
+            return fileditch_link(await self._run(fileditch_curl_command(wsl_path)))
+
+        session = self._session(service)
+        with open(file_path, 'rb') as f:
+            form = aiohttp.FormData()
+            if service == 'files.vc':
+                form.add_field('file', f, filename=filename)
+                headers = {'X-Account-ID': ACCOUNT_ID, 'X-API-Key': API_KEY}
+                async with session.post(FILESVC_UPLOAD_URL, data=form, headers=headers) as response:
+                    response.raise_for_status()
+                    return filesvc_link(await response.json(content_type=None))
+            if service == 'fileditch':
+                form.add_field('files[]', f, filename=filename)
+                async with session.post(FILEDITCH_UPLOAD_URL, data=form) as response:
+                    response.raise_for_status()
+                    return fileditch_link(await response.text(errors='replace'))
+            if service == 'catbox':
+                form.add_field('reqtype', 'fileupload')
+                form.add_field('userhash', CATBOX_USERHASH)
+                form.add_field('fileToUpload', f, filename=filename)
+                async with session.post(CATBOX_UPLOAD_URL, data=form) as response:
+                    response.raise_for_status()
+                    return (await response.text()).strip()
+        raise ValueError(f"Unknown service: {service}")
+
+    async def _run(self, command):
+        """Runs a command without blocking the loop and returns its stdout, raising CalledProcessError on failure."""
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+        return stdout.decode('utf-8', 'replace')
+
+    def _session(self, service):
+        """The service's keep-alive session, created on first use (inside the loop) with request and connection counters."""
+        if service not in self.sessions:
+            stats = self.stats[service] = [0, 0]
+
+            async def request_started(session, context, params):
+                stats[0] += 1
+
+            async def connection_opened(session, context, params):
+                stats[1] += 1
+
+            trace = aiohttp.TraceConfig()
+            trace.on_request_start.append(request_started)
+            trace.on_connection_create_end.append(connection_opened)
+            self.sessions[service] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=ASYNC_SERVICE_CONCURRENCY[service]),
+                timeout=aiohttp.ClientTimeout(total=None),
+                trace_configs=[trace]
+            )
+        return self.sessions[service]
+
 class FileUploaderApp:
     def __init__(self, root):
         root.geometry("1200x900")  
         self.root = root
         self.root.title("Multi-Service File Uploader")
         self.root.configure(bg="#1e1e1e")
-        self.service_queues = {
-            'files.vc': queue.Queue(),
-            'fileditch': queue.Queue(),
-            'lain.la': queue.Queue(),
-            'catbox': queue.Queue()
-        }
-        self.error_queue = queue.Queue()
-        self.upload_queue = queue.Queue()
-        self.consolidated_queue = queue.Queue()
+        # Every log line goes through one queue as (pane, message): a service name, 'consolidated' or 'errors'
+        self.ui_queue = queue.Queue()
         self.max_workers_var = tk.IntVar(value=10)
+        self.async_engine_var = tk.BooleanVar(value=False)
+        self.async_engine = None
         self.services = {
             'files.vc': tk.BooleanVar(value=True),
             'fileditch': tk.BooleanVar(value=True),
             'lain.la': tk.BooleanVar(value=True),
             'catbox': tk.BooleanVar(value=True)
         }
+        self.service_handlers = {
+            'files.vc': self.handle_filesvc,
+            'fileditch': self.handle_fileditch,
+            'lain.la': self.handle_lainla,
+            'catbox': self.handle_catbox
+        }
+        self.sessions = {service: PooledSession(size) for service, size in SERVICE_POOL_SIZE.items()}
+        self.retry_policy = RetryPolicy()
+        self.breakers = {service: CircuitBreaker() for service in self.services}
+        self.breaker_labels = {}
         self.service_frames = {}
+        self.service_panels = {}
+        self.service_panel_stats = {}
         self.consolidated_links = {}
         self.consolidated_lock = threading.Lock()
         self.save_log_var = tk.BooleanVar(value=False)
@@ -59,6 +442,7 @@ class FileUploaderApp:
         
         self.apply_dark_theme()        
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.root.after(100, self.update_logs)
 
     def apply_dark_theme(self):
@@ -93,6 +477,9 @@ class FileUploaderApp:
         for i, (name, var) in enumerate(self.services.items()):
             cb = ttk.Checkbutton(service_frame, text=name, variable=var)
             cb.grid(row=0, column=i, padx=5, pady=2)
+            breaker_label = ttk.Label(service_frame, text="OK")
+            breaker_label.grid(row=1, column=i, padx=5, pady=2)
+            self.breaker_labels[name] = breaker_label
 
         self.folder_btn = ttk.Button(self.root, text="Select Folder", command=self.select_folder)
         self.folder_btn.grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
@@ -107,12 +494,16 @@ class FileUploaderApp:
         self.clear_btn.pack(side=tk.LEFT, padx=5)
         self.save_log_check = ttk.Checkbutton(button_frame, text="Save Logs to File", variable=self.save_log_var)
         self.save_log_check.pack(side=tk.RIGHT, padx=5)
+        self.async_engine_check = ttk.Checkbutton(button_frame, text="Async Engine", variable=self.async_engine_var)
+        self.async_engine_check.pack(side=tk.RIGHT, padx=5)
+        if not aiohttp_available:
+            self.async_engine_check.config(state=tk.DISABLED)
 
         left_btn_frame = ttk.Frame(button_frame)
         left_btn_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Label(left_btn_frame, text="Max Concurrent:").pack(side=tk.LEFT, padx=5)
         self.max_workers_spin = ttk.Spinbox(
-            left_btn_frame, from_=1, to=50, width=4, textvariable=self.max_workers_var
+            left_btn_frame, from_=1, to=500, width=4, textvariable=self.max_workers_var
         )
         self.max_workers_spin.pack(side=tk.LEFT, padx=5)
 
@@ -131,6 +522,7 @@ class FileUploaderApp:
             text_widget['yscrollcommand'] = scrollbar.set
             
             self.service_frames[service] = text_widget
+            self.service_panels[service] = frame
 
         consolidated_frame = ttk.LabelFrame(self.root, text="Consolidated Links")
         consolidated_frame.grid(row=4, column=0, columnspan=2, padx=5, pady=5, sticky=tk.NSEW)
@@ -160,6 +552,11 @@ class FileUploaderApp:
         service_panels.grid_columnconfigure(0, weight=1)
         service_panels.grid_columnconfigure(1, weight=1)
 
+    def on_close(self):
+        if self.async_engine:
+            self.async_engine.close()
+        self.root.destroy()
+
     def clear_output(self):
         for service, widget in self.service_frames.items():
             widget.config(state=tk.NORMAL)
@@ -182,91 +579,151 @@ class FileUploaderApp:
     def start_upload(self):
         folder_path = self.folder_label.cget("text")
         if folder_path == "No folder selected":
-            self.error_queue.put("ERROR: Please select a folder first")
+            self.ui_queue.put(('errors', "ERROR: Please select a folder first"))
             return
         try:
             max_workers = int(self.max_workers_var.get())
             if max_workers < 1: raise ValueError
         except ValueError:
-            self.error_queue.put("Invalid concurrent files value. Using default 10.")
+            self.ui_queue.put(('errors', "Invalid concurrent files value. Using default 10."))
             max_workers = 10
 
+        enabled_services = [service for service, var in self.services.items() if var.get()]
+        if self.async_engine_var.get() and self.async_engine is None:
+            self.async_engine = AsyncUploadEngine(self)
         self.upload_btn.config(state=tk.DISABLED)
         threading.Thread(
             target=self.prepare_upload,
-            args=(folder_path, max_workers),
+            args=(folder_path, max_workers, enabled_services, self.async_engine_var.get()),
             daemon=True
         ).start()
 
-    def prepare_upload(self, folder_path, max_workers):
+    def prepare_upload(self, folder_path, max_workers, enabled_services, use_async_engine=False):
         try:
             files = [os.path.join(folder_path, f) 
                     for f in os.listdir(folder_path)
                     if os.path.isfile(os.path.join(folder_path, f))]
+            self.report_large_files(files, enabled_services)
             
-            for file_path in files:
-                self.upload_queue.put(file_path)
-            
-            workers = []
-            for _ in range(min(max_workers, len(files))):
-                worker = threading.Thread(
-                    target=self.upload_worker,
-                    daemon=True
-                )
-                worker.start()
-                workers.append(worker)
-            
-            self.upload_queue.join()
+            if use_async_engine:
+                self.async_engine.upload_files(files, enabled_services, max_workers)
+            else:
+                self.upload_files_threaded(files, enabled_services, max_workers)
             
         except Exception as e:
-            self.error_queue.put(f"Preparation Error: {str(e)}")
+            self.ui_queue.put(('errors', f"Preparation Error: {str(e)}"))
         finally:
             self.root.after(0, lambda: self.upload_btn.config(state=tk.NORMAL))
-            self.error_queue.put("Upload process completed")
+            self.ui_queue.put(('errors', "Upload process completed"))
 
-    def upload_worker(self):
-        while True:
-            try:
-                file_path = self.upload_queue.get_nowait()
-            except queue.Empty:
-                break
-            
-            filename = os.path.basename(file_path)
+    def upload_files_threaded(self, files, enabled_services, max_workers):
+        """
+        Feeds files to one upload pipeline per enabled service, with up to max_workers files in flight.
+        Each pipeline runs SERVICE_CONCURRENCY[service] uploads at once, so a file is sent to all
+        services in parallel and a slow host only holds up its own pipeline.
+        """
+        file_slots = threading.BoundedSemaphore(max_workers)
+        pipelines = {
+            service: ThreadPoolExecutor(max_workers=SERVICE_CONCURRENCY[service], thread_name_prefix=service)
+            for service in enabled_services
+        }
+        try:
+            for file_path in files:
+                file_slots.acquire()
+                self.dispatch_file(file_path, pipelines, file_slots)
+            # Every slot is free again once the last file has finished on all services
+            for _ in range(max_workers):
+                file_slots.acquire()
+        finally:
+            for pipeline in pipelines.values():
+                pipeline.shutdown(wait=True)
+
+    def upload_targets(self, file_path, services):
+        """Returns the services whose size limit the file fits, reporting the ones it is skipped for."""
+        filename = os.path.basename(file_path)
+        try:
             file_size = os.path.getsize(file_path)
-            
-            for service, var in self.services.items():
-                if var.get():
-                    if file_size > SIZE_LIMITS[service]:
-                        self.error_queue.put(
-                            f"[{service}] Skipped {filename} (File too large: {self.format_size(file_size)} > {self.format_size(SIZE_LIMITS[service])})"
-                        )
-                        continue
-                        
-                    try:
-                        if service == 'files.vc':
-                            self.handle_filesvc(file_path)
-                        elif service == 'fileditch':
-                            self.handle_fileditch(file_path)
-                        elif service == 'lain.la':
-                            self.handle_lainla(file_path)
-                        elif service == 'catbox':
-                            self.handle_catbox(file_path)
-                    except Exception as e:
-                        self.error_queue.put(f"[{service}] {filename}: {str(e)}")
-            
-            ordered_services = ['lain.la', 'catbox', 'fileditch', 'files.vc']
-            links = []
-            for service in ordered_services:
-                if self.services[service].get():
-                    with self.consolidated_lock:
-                        if filename in self.consolidated_links and service in self.consolidated_links[filename]:
-                            links.append(f'"{self.consolidated_links[filename][service]}"')
-            
-            if links:
-                consolidated_line = f"{filename}: {', '.join(links)}"
-                self.consolidated_queue.put(consolidated_line)
-            
-            self.upload_queue.task_done()
+        except OSError as e:
+            self.ui_queue.put(('errors', f"{filename}: {str(e)}"))
+            return []
+
+        targets = []
+        for service in services:
+            if file_size > SIZE_LIMITS[service]:
+                self.ui_queue.put(('errors',
+                    f"[{service}] Skipped {filename} (File too large: {self.format_size(file_size)} > {self.format_size(SIZE_LIMITS[service])})"
+                ))
+            else:
+                targets.append(service)
+        return targets
+
+    def report_large_files(self, files, services):
+        """Tells once per service how many files can't be resumed and so get fewer whole-file retries."""
+        sizes = []
+        for file_path in files:
+            try:
+                sizes.append(os.path.getsize(file_path))
+            except OSError:
+                continue
+        for service in services:
+            count = sum(1 for size in sizes if LARGE_FILE_SIZE <= size <= SIZE_LIMITS[service])
+            if count:
+                self.ui_queue.put(('errors',
+                    f"[{service}] {count} file(s) of {self.format_size(LARGE_FILE_SIZE)} or more can't be resumed; "
+                    f"each is retried from the beginning at most {LARGE_FILE_MAX_RETRIES} times"
+                ))
+
+    def dispatch_file(self, file_path, pipelines, file_slots):
+        """
+        Submits a file to the pipeline of every service whose size limit it fits. When the last of them
+        finishes, the file's consolidated line is emitted and its slot released.
+        """
+        filename = os.path.basename(file_path)
+        targets = self.upload_targets(file_path, pipelines)
+        if not targets:
+            file_slots.release()
+            return
+
+        remaining = [len(targets)]
+        remaining_lock = threading.Lock()
+
+        def service_finished(_future):
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self.emit_consolidated_line(filename, pipelines)
+            file_slots.release()
+
+        for service in targets:
+            pipelines[service].submit(self.upload_to_service, service, file_path).add_done_callback(service_finished)
+
+    def upload_to_service(self, service, file_path):
+        try:
+            self.service_handlers[service](file_path)
+        except Exception as e:
+            self.ui_queue.put(('errors', f"[{service}] {os.path.basename(file_path)}: {str(e)}"))
+
+    def emit_consolidated_line(self, filename, services):
+        links = []
+        for service in CONSOLIDATED_ORDER:
+            if service in services:
+                with self.consolidated_lock:
+                    if filename in self.consolidated_links and service in self.consolidated_links[filename]:
+                        links.append(f'"{self.consolidated_links[filename][service]}"')
+        
+        if links:
+            consolidated_line = f"{filename}: {', '.join(links)}"
+            self.ui_queue.put(('consolidated', consolidated_line))
+
+    def record_link(self, service, filename, link):
+        if self.breakers[service].record_success():
+            self.ui_queue.put(('errors', f"[{service}] Service is back, resuming uploads"))
+        self.ui_queue.put((service, f"{filename}: {link}"))
+        with self.consolidated_lock:
+            if filename not in self.consolidated_links:
+                self.consolidated_links[filename] = {}
+            self.consolidated_links[filename][service] = link
 
     def format_size(self, size_bytes):
         for unit in ['B', 'KB', 'MB', 'GB']:
@@ -277,11 +734,13 @@ class FileUploaderApp:
 
     def handle_filesvc(self, file_path):
         filename = os.path.basename(file_path)
-        for attempt in range(MAX_RETRIES + 1):
+        retries = retry_limit(file_path)
+        for attempt in range(retries + 1):
+            self.wait_for_service('files.vc')
             try:
                 with open(file_path, 'rb') as f:
-                    response = requests.post(
-                        'https://api.files.vc/upload',
+                    response = self.sessions['files.vc'].post(
+                        FILESVC_UPLOAD_URL,
                         files={'file': (filename, f)},
                         headers={
                             'X-Account-ID': ACCOUNT_ID,
@@ -289,21 +748,16 @@ class FileUploaderApp:
                         }
                     )
                     response.raise_for_status()
-                    data = response.json()
-                    debug_info = data.get('debug_info', {})
-                    link = f"https://files.vc/d/dl?hash={debug_info.get('hash', '')}"
-                    self.service_queues['files.vc'].put(f"{filename}: {link}")
-                    with self.consolidated_lock:
-                        if filename not in self.consolidated_links:
-                            self.consolidated_links[filename] = {}
-                        self.consolidated_links[filename]['files.vc'] = link
+                    self.record_link('files.vc', filename, filesvc_link(response.json()))
                     return
             except Exception as e:
-                self.handle_retry('files.vc', filename, attempt, e)
+                self.handle_retry('files.vc', filename, attempt, e, retries)
 
     def handle_fileditch(self, file_path):
         filename = os.path.basename(file_path)
-        for attempt in range(MAX_RETRIES + 1):
+        retries = retry_limit(file_path)
+        for attempt in range(retries + 1):
+            self.wait_for_service('fileditch')
             try:
                 if platform.system() == "Windows":
                     wsl_path = subprocess.check_output(
@@ -313,8 +767,7 @@ class FileUploaderApp:
                     ).strip()
                     
                     result = subprocess.run(
-                        ['wsl', 'curl', '-sS', '-H', 'Expect:', '-F', f'files[]=@"{wsl_path}"', 
-                        'https://up1.fileditch.com/upload.php'],
+                        fileditch_curl_command(wsl_path),
                         capture_output=True,
                         text=True,
                         encoding='utf-8',
@@ -324,47 +777,23 @@ class FileUploaderApp:
                     raw_response = result.stdout
                 else:
                     with open(file_path, 'rb') as f:
-                        response = requests.post(
-                            'https://up1.fileditch.com/upload.php',
+                        response = self.sessions['fileditch'].post(
+                            FILEDITCH_UPLOAD_URL,
                             files={'files[]': (filename, f)}
                         )
+                        response.raise_for_status()
                         raw_response = response.text
 
-                try:
-                    raw_response = raw_response.encode('utf-8', 'replace').decode('utf-8', 'replace')
-                except AttributeError:
-                    pass
-
-                if raw_response.startswith('HTTP/'):
-                    try:
-                        headers, body = raw_response.split('\n\n', 1)
-                        raw_response = body
-                    except ValueError:
-                        pass
-
-                response_data = json.loads(raw_response)
-                
-                if response_data.get('success') and response_data.get('files'):
-                    first_file = response_data['files'][0]
-                    clean_url = first_file['url'].replace('\\/', '/')
-                    self.service_queues['fileditch'].put(f"{filename}: {clean_url}")
-                    with self.consolidated_lock:
-                        if filename not in self.consolidated_links:
-                            self.consolidated_links[filename] = {}
-                        self.consolidated_links[filename]['fileditch'] = clean_url
-                    return
-                else:
-                    raise ValueError("Invalid response structure")
-                
-            except json.JSONDecodeError as e:
-                error_msg = f"JSON parsing failed. First 500 chars: {raw_response[:500]}..."
-                self.handle_retry('fileditch', filename, attempt, error_msg)
+                self.record_link('fileditch', filename, fileditch_link(raw_response))
+                return
             except Exception as e:
-                self.handle_retry('fileditch', filename, attempt, str(e))
+                self.handle_retry('fileditch', filename, attempt, e, retries)
 
     def handle_lainla(self, file_path):
         filename = os.path.basename(file_path)
-        for attempt in range(MAX_RETRIES + 1):
+        retries = retry_limit(file_path)
+        for attempt in range(retries + 1):
+            self.wait_for_service('lain.la')
             try:
                 result = subprocess.run(
                     ['lain-upload', file_path],
@@ -372,28 +801,20 @@ class FileUploaderApp:
                     text=True,
                     check=True
                 )
-                
-                url_match = re.search(r'https?://[^\s]+', result.stdout)
-                if url_match:
-                    url = url_match.group()
-                    self.service_queues['lain.la'].put(f"{filename}: {url}")
-                    with self.consolidated_lock:
-                        if filename not in self.consolidated_links:
-                            self.consolidated_links[filename] = {}
-                        self.consolidated_links[filename]['lain.la'] = url
-                    return
-                else:
-                    raise ValueError("No URL found in output")
+                self.record_link('lain.la', filename, lainla_link(result.stdout))
+                return
             except Exception as e:
-                self.handle_retry('lain.la', filename, attempt, str(e))
+                self.handle_retry('lain.la', filename, attempt, e, retries)
 
     def handle_catbox(self, file_path):
         filename = os.path.basename(file_path)
-        for attempt in range(MAX_RETRIES + 1):
+        retries = retry_limit(file_path)
+        for attempt in range(retries + 1):
+            self.wait_for_service('catbox')
             try:
                 with open(file_path, 'rb') as f:
-                    response = requests.post(
-                        'https://catbox.moe/user/api.php',
+                    response = self.sessions['catbox'].post(
+                        CATBOX_UPLOAD_URL,
                         files={
                             'reqtype': (None, 'fileupload'),
                             'userhash': (None, CATBOX_USERHASH),
@@ -401,58 +822,101 @@ class FileUploaderApp:
                         }
                     )
                     response.raise_for_status()
-                    link = response.text.strip()
-                    self.service_queues['catbox'].put(f"{filename}: {link}")
-                    with self.consolidated_lock:
-                        if filename not in self.consolidated_links:
-                            self.consolidated_links[filename] = {}
-                        self.consolidated_links[filename]['catbox'] = link
+                    self.record_link('catbox', filename, response.text.strip())
                     return
             except Exception as e:
-                self.handle_retry('catbox', filename, attempt, str(e))
+                self.handle_retry('catbox', filename, attempt, e, retries)
 
-    def handle_retry(self, service, filename, attempt, error):
-        if attempt < MAX_RETRIES:
-            self.error_queue.put(
-                f"[{service}] Retrying {filename} in {RETRY_DELAY}s (Attempt {attempt + 1}/{MAX_RETRIES})"
-            )
-            time.sleep(RETRY_DELAY)
+    def wait_for_service(self, service):
+        """Blocks while the service's circuit breaker has uploads to it paused."""
+        while (wait := self.breakers[service].wait_time()) > 0:
+            time.sleep(wait)
+
+    def handle_retry(self, service, filename, attempt, error, retries=MAX_RETRIES):
+        delay = self.report_attempt_failure(service, filename, attempt, error, retries)
+        if delay is not None:
+            time.sleep(delay)
+
+    def report_attempt_failure(self, service, filename, attempt, error, retries=MAX_RETRIES):
+        """
+        Reports a failed upload attempt, counting it against the service's circuit breaker if the service
+        itself failed (see is_service_failure). Returns the backoff to sleep before the next attempt, or
+        None if the file has used all of its retries.
+        """
+        breaker = self.breakers[service]
+        if not is_service_failure(error):
+            breaker.release_probe()
         else:
-            self.error_queue.put(f"[{service}] Failed to upload {filename}: {str(error)}")
+            pause = retry_after_seconds(error) or 0
+            if breaker.record_failure(pause):
+                self.ui_queue.put(('errors',
+                    f"[{service}] Pausing uploads to this service for {breaker.pause_length(pause):.0f}s "
+                    f"after repeated failures: {str(error)}"
+                ))
+        if attempt < retries:
+            delay = self.retry_policy.delay(attempt, error)
+            self.ui_queue.put(('errors',
+                f"[{service}] Retrying {filename} in {delay:.1f}s (Attempt {attempt + 1}/{retries})"
+            ))
+            return delay
+        self.ui_queue.put(('errors', f"[{service}] Failed to upload {filename}: {str(error)}"))
+        return None
 
     def update_logs(self):
-        for service, q in self.service_queues.items():
-            while not q.empty():
-                msg = q.get_nowait()
-                text_widget = self.service_frames[service]
-                text_widget.config(state=tk.NORMAL)
-                text_widget.insert(tk.END, msg + "\n")
-                text_widget.config(state=tk.DISABLED)
-                text_widget.see(tk.END)
-        
-        while not self.consolidated_queue.empty():
-            msg = self.consolidated_queue.get_nowait()
-            self.consolidated_text.config(state=tk.NORMAL)
-            start_index = self.consolidated_text.index("end-1c")
-            self.consolidated_text.insert(tk.END, msg + "\n")
-            colon_pos = self.consolidated_text.search(":", start_index, stopindex=tk.END, exact=True, regexp=False)
-            if colon_pos:
-                self.consolidated_text.tag_add("bold", start_index, colon_pos)
-            self.consolidated_text.config(state=tk.DISABLED)
-            self.consolidated_text.see(tk.END)
-        
-        while not self.error_queue.empty():
-            msg = self.error_queue.get_nowait()
-            self.error_text.config(state=tk.NORMAL)
-            self.error_text.insert(tk.END, msg + "\n")
-            self.error_text.config(state=tk.DISABLED)
-            self.error_text.see(tk.END)
+        """
+        Moves up to UI_BATCH_MAX queued messages into the output panes, with one insert per pane
+        however many messages arrived since the last refresh.
+        """
+        batches = {}
+        for _ in range(UI_BATCH_MAX):
+            try:
+                pane, msg = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            batches.setdefault(pane, []).append(msg)
+
+        for pane, messages in batches.items():
+            if pane == 'consolidated':
+                text_widget = self.consolidated_text
+                # Alternating text/tags pairs: each line's filename (up to the first colon) is bold
+                chunks = []
+                for msg in messages:
+                    filename, colon, rest = msg.partition(":")
+                    if colon:
+                        chunks += [filename, "bold", colon + rest + "\n", ()]
+                    else:
+                        chunks += [msg + "\n", ()]
+            else:
+                text_widget = self.error_text if pane == 'errors' else self.service_frames[pane]
+                chunks = ["".join(msg + "\n" for msg in messages)]
+            text_widget.config(state=tk.NORMAL)
+            text_widget.insert(tk.END, *chunks)
+            text_widget.config(state=tk.DISABLED)
+            text_widget.see(tk.END)
         
+        self.update_connection_stats()
+        for service, label in self.breaker_labels.items():
+            status = self.breakers[service].status()
+            if label.cget("text") != status:
+                label.config(text=status)
+
         if self.save_log_var.get():
             self.save_logs_to_file()
         
         self.root.after(100, self.update_logs)
 
+    def update_connection_stats(self):
+        """Shows in each service panel's title how many requests were sent over how many connections."""
+        for service, panel in self.service_panels.items():
+            sent, opened = self.sessions[service].connection_stats() if service in self.sessions else (0, 0)
+            if self.async_engine:
+                async_sent, async_opened = self.async_engine.connection_stats(service)
+                sent, opened = sent + async_sent, opened + async_opened
+            if (sent, opened) == self.service_panel_stats.get(service, (0, 0)):
+                continue
+            self.service_panel_stats[service] = (sent, opened)
+            panel.config(text=f"{service} Uploads ({sent} requests, {opened} connections, {sent - opened} reused)")
+
     def save_logs_to_file(self):
         log_content = "=== Service Logs ===\n"
         folder_path = self.folder_label.cget("text").rstrip("/").rsplit("/", 1)[-1]
@@ -473,7 +937,7 @@ class FileUploaderApp:
             with open(f"upload_log_{folder_path}.txt", "w", encoding="utf-8") as f:
                 f.write(log_content)
         except Exception as e:
-            self.error_queue.put(f"Error saving log file: {str(e)}")
+            self.ui_queue.put(('errors', f"Error saving log file: {str(e)}"))
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,42 +1,14 @@
 import os
+import sys
 import tkinter as tk
 from tkinter import filedialog
-from mutagen.flac import FLAC
-from mutagen.mp3 import MP3
-from mutagen.easyid3 import EasyID3
-from mutagen import MutagenError
 import json
 import pyperclip
+from LibraryScanner import DEFAULT_JOBS, group_by_top_level, scan_albums, scan_library, walk_album_folders
 
-def get_metadata(file_path, ext):
-    """Extracts album, artist, sample rate, and duration from an audio file."""
-    try:
-        album = ''
-        artist = ''
-        sample_rate = 0
-        duration = 0.0
-        if ext == '.flac':
-            audio = FLAC(file_path)
-            album = audio.tags.get('ALBUM', [''])[0].strip()
-            artist_tags = audio.tags.get('ALBUMARTIST', audio.tags.get('ARTIST', ['']))
-            artist = artist_tags[0].strip() if artist_tags else ''
-            sample_rate = audio.info.sample_rate
-            duration = audio.info.length
-        elif ext == '.mp3':
-            audio_tech = MP3(file_path)
-            sample_rate = audio_tech.info.sample_rate
-            duration = audio_tech.info.length
-            
-            audio_tags = EasyID3(file_path)
-            album = audio_tags.get('album', [''])[0].strip()
-            artist_tags = audio_tags.get('albumartist', audio_tags.get('artist', ['']))
-            artist = artist_tags[0].strip() if artist_tags else ''
-        else:
-            return ('', '', 0, 0.0)
-        return (album, artist, sample_rate, duration)
-    except MutagenError as e:
-        print(f"Error reading tags from {file_path}: {e}")
-        return ('', '', 0, 0.0)
+MANIFEST_FILENAME = '.music_index_manifest.json'
+MANIFEST_VERSION = 1
+INDEX_DATA_MARKER = 'const linksData = '
 
 def format_size(size_bytes):
     """Converts bytes to a human-readable string (MB or GB)."""
@@ -62,6 +34,22 @@ def format_duration(total_seconds):
     else:
         return f"{minutes}:{seconds:02d}"
 
+def album_tags(album_details):
+    """
+    Builds the tags list of an album link: format, track count, duration, sample rate and size.
+    A duration that includes estimated track lengths is marked with a leading "~".
+    """
+    tags = [album_details["format"]]
+    if album_details.get("track_count"):
+        tags.append(f'{album_details["track_count"]} tracks')
+    if album_details.get("duration_str"):
+        tags.append(("~" if album_details.get("duration_estimated") else "") + album_details["duration_str"])
+    if album_details.get("sample_rate_khz"):
+        tags.append(f'{album_details["sample_rate_khz"]:.1f}kHz')
+    if album_details.get("size_str"):
+        tags.append(album_details["size_str"])
+    return tags
+
 def build_string_manually(artist_name, album_list):
     """
     Builds the JSON item string with exact formatting, including new tags.
@@ -83,18 +71,7 @@ def build_string_manually(artist_name, album_list):
     
     # 2. Each album link object
     for album_details in album_list:
-        # Build the tags list dynamically
-        tags = [f'"{album_details["format"]}"']
-        if album_details.get("track_count"):
-            tags.append(f'"{album_details["track_count"]} tracks"')
-        if album_details.get("duration_str"):
-            tags.append(f'"{album_details["duration_str"]}"')
-        if album_details.get("sample_rate_khz"):
-            tags.append(f'"{album_details["sample_rate_khz"]:.1f}kHz"')
-        if album_details.get("size_str"):
-            tags.append(f'"{album_details["size_str"]}"')
-            
-        tags_str = ", ".join(tags)
+        tags_str = ", ".join(f'"{tag}"' for tag in album_tags(album_details))
 
         album_link = (
             '      {\n'
@@ -122,56 +99,42 @@ def build_string_manually(artist_name, album_list):
     return final_string
 
 
+def summarize_album(record):
+    """
+    Summarizes one scanned album folder (see LibraryScanner) and returns (album_artist, album_data),
+    or None if the folder's first audio file lacks an album or artist tag.
+    """
+    if not record.tracks:
+        return None
+    first_track = record.tracks[0]
+    if not (first_track.artist and first_track.album):
+        return None
+
+    sample_rates = [track.sample_rate for track in record.tracks if track.sample_rate > 0]
+    min_sample_rate_khz = min(sample_rates) / 1000 if sample_rates else None
+    album_data = {
+        "title": first_track.album,
+        "format": first_track.format,
+        "track_count": len(record.tracks),
+        "size_str": format_size(record.total_size),
+        "sample_rate_khz": min_sample_rate_khz,
+        "duration_str": format_duration(sum(track.duration for track in record.tracks)),
+        "duration_estimated": any(track.estimated for track in record.tracks),
+    }
+    return first_track.artist, album_data
+
+
 def process_directory(directory):
     """
     Processes a directory to find all albums, verifies they belong to a single artist,
     and then generates the JSON item string with detailed tags.
     """
     all_albums_by_artist = {}
-    for root, _, files in os.walk(directory):
-        # Data for the current directory (considered one album)
-        album_title, album_artist, audio_format = (None, None, None)
-        track_count = 0
-        total_size_bytes = 0
-        total_duration_seconds = 0.0
-        sample_rates = []
-
-        first_audio_file_found = False
-        for file in files:
-            file_path = os.path.join(root, file)
-            total_size_bytes += os.path.getsize(file_path)
-            
-            ext = os.path.splitext(file)[1].lower()
-            if ext in {'.flac', '.mp3'}:
-                track_count += 1
-                current_album, current_artist, current_rate, current_duration = get_metadata(file_path, ext)
-                
-                total_duration_seconds += current_duration
-                if current_rate > 0:
-                    sample_rates.append(current_rate)
-                
-                if not first_audio_file_found:
-                    album_title = current_album
-                    album_artist = current_artist
-                    audio_format = ext[1:].upper()
-                    first_audio_file_found = True
-        
-        # If we found an album in this folder, process and store it
-        if first_audio_file_found and album_artist and album_title:
-            if album_artist not in all_albums_by_artist:
-                all_albums_by_artist[album_artist] = []
-            
-            min_sample_rate_khz = min(sample_rates) / 1000 if sample_rates else None
-
-            album_data = {
-                "title": album_title,
-                "format": audio_format,
-                "track_count": track_count,
-                "size_str": format_size(total_size_bytes),
-                "sample_rate_khz": min_sample_rate_khz,
-                "duration_str": format_duration(total_duration_seconds),
-            }
-            all_albums_by_artist[album_artist].append(album_data)
+    for record in scan_library(directory):
+        album = summarize_album(record)
+        if album:
+            album_artist, album_data = album
+            all_albums_by_artist.setdefault(album_artist, []).append(album_data)
 
     if not all_albums_by_artist:
         print("No valid audio albums found in the selected directory.")
@@ -200,6 +163,217 @@ def process_directory(directory):
         print(f"\n❌ Could not copy to clipboard: {e}")
 
 
+def write_artist_items(album_records, out):
+    """
+    Writes one {category, links} item per album artist found in album_records (the scanned album
+    folders of one top-level folder), in folder order. Returns the number of items written.
+    """
+    albums_by_artist = {}
+    for record in album_records:
+        album = summarize_album(record)
+        if album:
+            album_artist, album_data = album
+            albums_by_artist.setdefault(album_artist, []).append(album_data)
+    for artist_name, album_list in albums_by_artist.items():
+        out.write(build_string_manually(artist_name, album_list) + '\n')
+    out.flush()
+    return len(albums_by_artist)
+
+
+def stream_artist_index(library_root, out, jobs=DEFAULT_JOBS):
+    """
+    Multi-artist mode: walks a library root once and writes one {category, links} item per artist to
+    `out` as soon as that artist's folder has been read, so only one folder's albums are held in memory.
+    Each top-level folder is expected to hold one artist; its albums are read in parallel by `jobs`
+    threads and grouped by their album artist tag, in folder order.
+    Returns the number of items written.
+    """
+    items_written = 0
+    for top_folder, album_records in group_by_top_level(scan_library(library_root, jobs, sort=True), library_root):
+        written = write_artist_items(album_records, out)
+        if not written:
+            print(f"No valid audio albums found in {top_folder}", file=sys.stderr)
+        items_written += written
+    return items_written
+
+
+def load_manifest(manifest_path):
+    """
+    Reads a rebuild manifest: {relative_album_folder: {'signature', 'artist', 'album'}}, where 'album'
+    holds the computed album data (None, like 'artist', for a folder that is not a tagged album).
+    A missing or outdated manifest loads as empty, so every folder is rescanned.
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('folders', {})
+
+
+def save_manifest(manifest_path, folders):
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'folders': folders}, f, ensure_ascii=False)
+    os.replace(temp_path, manifest_path)
+
+
+def read_index(index_path):
+    """Returns (page_text, links_data, start, end), where page_text[start:end] is the linksData array."""
+    with open(index_path, 'r', encoding='utf-8') as f:
+        page_text = f.read()
+    marker = page_text.find(INDEX_DATA_MARKER)
+    if marker < 0:
+        raise ValueError(f"No '{INDEX_DATA_MARKER.strip()}' array found in {index_path}")
+    start = marker + len(INDEX_DATA_MARKER)
+    links_data, end = json.JSONDecoder().raw_decode(page_text, start)
+    return page_text, links_data, start, end
+
+
+def format_index_data(links_data):
+    """Serializes linksData in the index's own layout: one key per line, lists kept on one line."""
+    categories = []
+    for category in links_data:
+        fields = []
+        for key, value in category.items():
+            if key == 'links':
+                links = []
+                for link in value:
+                    link_fields = ',\n'.join(
+                        f'        {json.dumps(link_key, ensure_ascii=False)}: {json.dumps(link_value, ensure_ascii=False)}'
+                        for link_key, link_value in link.items()
+                    )
+                    links.append('      {\n' + link_fields + '\n      }')
+                fields.append('    "links": [\n' + ',\n'.join(links) + '\n    ]')
+            else:
+                fields.append(f'    {json.dumps(key, ensure_ascii=False)}: {json.dumps(value, ensure_ascii=False)}')
+        categories.append('  {\n' + ',\n'.join(fields) + '\n  }')
+    return '[\n' + ',\n'.join(categories) + '\n]'
+
+
+def splice_album(links_data, categories, artist_name, album_data):
+    """
+    Writes one album's computed tags into the index data. A link with the same title in the artist's
+    category keeps its url, description and position and only gets the new tags; otherwise a link (and,
+    for a new artist, a category starting with a "Folder" link) is appended.
+    Returns 'updated', 'added' or 'unchanged'.
+    """
+    tags = album_tags(album_data)
+    category = categories.get(artist_name)
+    if category is None:
+        category = {"category": artist_name, "links": [{"title": "Folder", "url": [], "description": "", "tags": []}]}
+        links_data.append(category)
+        categories[artist_name] = category
+
+    links = category["links"]
+    album_links = links[1:] if links and links[0].get("title") == "Folder" else links
+    link = next((link for link in album_links if link.get("title") == album_data["title"]), None)
+    if link is None:
+        links.append({"title": album_data["title"], "url": [], "description": "", "tags": tags})
+        return 'added'
+    if link.get("tags") == tags:
+        return 'unchanged'
+    link["tags"] = tags
+    return 'updated'
+
+
+def rebuild_index(index_path, library_root, manifest_path=None, jobs=DEFAULT_JOBS):
+    """
+    Incrementally refreshes the linksData of an index page (such as MusicIndex.html) from a library.
+    Album folders whose file signature matches the manifest are skipped; only the others are rescanned,
+    in parallel, and their tags spliced into the existing data. Links of folders that were removed from
+    the library are left in the index, since their urls and descriptions are maintained by hand.
+    """
+    manifest_path = manifest_path or os.path.join(library_root, MANIFEST_FILENAME)
+    manifest = load_manifest(manifest_path)
+    page_text, links_data, start, end = read_index(index_path)
+    categories = {category["category"]: category for category in links_data}
+
+    folders, changed = {}, []
+    for record in walk_album_folders(library_root, sort=True):
+        relative = os.path.relpath(record.path, library_root)
+        signature = record.signature()
+        entry = manifest.get(relative)
+        if entry and entry.get('signature') == signature:
+            folders[relative] = entry
+        else:
+            changed.append(record)
+
+    results = {'updated': 0, 'added': 0, 'unchanged': 0}
+    for record in scan_albums(changed, jobs):
+        album = summarize_album(record)
+        album_artist, album_data = album if album else (None, None)
+        folders[os.path.relpath(record.path, library_root)] = {
+            'signature': record.signature(), 'artist': album_artist, 'album': album_data}
+        if album:
+            results[splice_album(links_data, categories, album_artist, album_data)] += 1
+
+    if results['updated'] or results['added']:
+        temp_path = index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(page_text[:start] + format_index_data(links_data) + page_text[end:])
+        os.replace(temp_path, index_path)
+    save_manifest(manifest_path, folders)
+
+    print(f"Rescanned {len(changed)} of {len(folders)} album folders: "
+          f"{results['updated']} links updated, {results['added']} added, {results['unchanged']} unchanged.")
+    return results
+
+
+def parse_options(args):
+    """Splits command-line args into (positional_args, {'out', 'manifest', 'jobs'})."""
+    positional, options = [], {'out': None, 'manifest': None, 'jobs': DEFAULT_JOBS}
+    i = 0
+    while i < len(args):
+        if args[i] in ('-o', '--out', '--manifest') and i + 1 < len(args):
+            options['manifest' if args[i] == '--manifest' else 'out'] = args[i + 1]
+            i += 2
+        elif args[i] in ('-j', '--jobs') and i + 1 < len(args):
+            try:
+                options['jobs'] = max(1, int(args[i + 1]))
+            except ValueError:
+                print(f"Invalid value for --jobs: {args[i + 1]}", file=sys.stderr)
+                sys.exit(1)
+            i += 2
+        else:
+            positional.append(args[i])
+            i += 1
+    return positional, options
+
+
+def run_library_mode(args):
+    """Handles 'JSONFromFiles.py --all LIBRARY_ROOT [--out FILE] [--jobs N]'."""
+    positional, options = parse_options(args)
+    library_root, output_path, jobs = (positional[0] if positional else None), options['out'], options['jobs']
+
+    if not library_root or not os.path.isdir(library_root):
+        print("Usage: JSONFromFiles.py --all LIBRARY_ROOT [--out FILE] [--jobs N]", file=sys.stderr)
+        sys.exit(1)
+
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as out:
+            items_written = stream_artist_index(library_root, out, jobs)
+        print(f"Wrote {items_written} artist items to '{output_path}'.", file=sys.stderr)
+    else:
+        items_written = stream_artist_index(library_root, sys.stdout, jobs)
+        print(f"Wrote {items_written} artist items.", file=sys.stderr)
+
+
+def run_rebuild_mode(args):
+    """Handles 'JSONFromFiles.py --rebuild INDEX_HTML LIBRARY_ROOT [--manifest FILE] [--jobs N]'."""
+    positional, options = parse_options(args)
+    if len(positional) != 2 or not os.path.isfile(positional[0]) or not os.path.isdir(positional[1]):
+        print("Usage: JSONFromFiles.py --rebuild INDEX_HTML LIBRARY_ROOT [--manifest FILE] [--jobs N]")
+        sys.exit(1)
+    try:
+        rebuild_index(positional[0], positional[1], options['manifest'], options['jobs'])
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not rebuild {positional[0]}: {e}")
+        sys.exit(1)
+
+
 def select_directory():
     """Opens a dialog to select the root directory for processing."""
     root = tk.Tk()
@@ -211,4 +385,9 @@ def select_directory():
         print("No directory selected.")
 
 if __name__ == "__main__":
-    select_directory()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] in ('-a', '--all'):
+        run_library_mode(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == '--rebuild':
+        run_rebuild_mode(sys.argv[2:])
+    else:
+        select_directory()
\ No newline at end of file
@@ -0,0 +1,188 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from mutagen import MutagenError
+from AudioProbe import ProbeError, probe_file
+
+# --- Configuration ---
+AUDIO_EXTENSIONS = ('.flac', '.mp3')
+DEFAULT_JOBS = 4
+SCAN_LOOKAHEAD_PER_JOB = 4
+
+FileEntry = Tuple[str, int, int]
+
+class TrackInfo(NamedTuple):
+    """One audio file of an album. A file that could not be read has empty tags and no stream info."""
+    filename: str
+    format: str
+    album: str
+    artist: str
+    sample_rate: int
+    duration: float
+    estimated: bool
+
+class AlbumRecord(NamedTuple):
+    """
+    One folder holding audio files. `files` lists every file of the folder as (name, size, mtime_ns)
+    in walk order, taken from the stat results of the scan; `tracks` has the .flac and .mp3 files in
+    the same order, or is None for a record that has only been walked (see walk_album_folders).
+    """
+    path: str
+    files: List[FileEntry]
+    tracks: Optional[List[TrackInfo]] = None
+
+    @property
+    def total_size(self) -> int:
+        return sum(size for _, size, _ in self.files)
+
+    def signature(self) -> List[List]:
+        """The sorted [name, size, mtime_ns] of the folder's files, as stored in rebuild manifests."""
+        return sorted([name, size, mtime_ns] for name, size, mtime_ns in self.files)
+
+def walk_album_folders(library_root: str, sort: bool = False) -> Iterator[AlbumRecord]:
+    """
+    Walks library_root once with os.scandir, in the same top-down order as os.walk (symlinked folders
+    are listed but not entered), and yields an unscanned AlbumRecord for every folder that holds audio
+    files. With sort, folders and files are visited in name order instead of directory order.
+    """
+    pending = [library_root]
+    while pending:
+        dirpath = pending.pop()
+        files: List[FileEntry] = []
+        subfolders: List[str] = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                subfolders.append(entry.path)
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            continue
+
+        if sort:
+            files.sort()
+            subfolders.sort()
+        if any(name.lower().endswith(AUDIO_EXTENSIONS) for name, _, _ in files):
+            yield AlbumRecord(dirpath, files)
+        pending.extend(reversed(subfolders))
+
+def read_track(file_path: str, read_stream: bool = True) -> TrackInfo:
+    """Probes one audio file; read errors are reported on stderr and give an empty TrackInfo."""
+    filename = os.path.basename(file_path)
+    ext = os.path.splitext(filename)[1].lower()
+    audio_format = ext[1:].upper()
+    try:
+        probe = probe_file(file_path, ext, read_stream)
+    except (MutagenError, ProbeError) as e:
+        print(f"Error reading tags from {file_path}: {e}", file=sys.stderr)
+        return TrackInfo(filename, audio_format, '', '', 0, 0.0, False)
+    album = probe.tags.get('album', [''])[0].strip()
+    artist_tags = probe.tags.get('albumartist', probe.tags.get('artist', ['']))
+    artist = artist_tags[0].strip() if artist_tags else ''
+    return TrackInfo(filename, audio_format, album, artist, probe.sample_rate, probe.duration, probe.estimated)
+
+def read_album(record: AlbumRecord, read_stream: bool = True) -> AlbumRecord:
+    """Fills in the tracks of a walked record."""
+    tracks = [read_track(os.path.join(record.path, name), read_stream)
+              for name, _, _ in record.files if name.lower().endswith(AUDIO_EXTENSIONS)]
+    return record._replace(tracks=tracks)
+
+def scan_albums(records: Iterable[AlbumRecord], jobs: int = DEFAULT_JOBS, read_stream: bool = True) -> Iterator[AlbumRecord]:
+    """
+    Reads the tracks of walked records with `jobs` threads and yields them in input order. At most
+    jobs * SCAN_LOOKAHEAD_PER_JOB albums are in flight, so memory stays bounded on large libraries.
+    With read_stream=False only tags are read (no sample rate or duration).
+    """
+    if jobs <= 1:
+        for record in records:
+            yield read_album(record, read_stream)
+        return
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        in_flight = deque()
+        for record in records:
+            in_flight.append(executor.submit(read_album, record, read_stream))
+            if len(in_flight) >= jobs * SCAN_LOOKAHEAD_PER_JOB:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def scan_library(library_root: str, jobs: int = DEFAULT_JOBS, read_stream: bool = True, sort: bool = False) -> Iterator[AlbumRecord]:
+    """Walks library_root once and yields a fully read AlbumRecord per album folder."""
+    return scan_albums(walk_album_folders(library_root, sort), jobs, read_stream)
+
+def group_by_top_level(records: Iterable[AlbumRecord], library_root: str) -> Iterator[Tuple[str, List[AlbumRecord]]]:
+    """
+    Groups a record stream by the folder directly under library_root that each album is in, yielding
+    (top_level_folder, records) as soon as a group is complete. Albums directly in library_root form a
+    group of their own.
+    """
+    def top_level(record: AlbumRecord) -> str:
+        relative = os.path.relpath(record.path, library_root)
+        return library_root if relative == os.curdir else os.path.join(library_root, relative.split(os.sep)[0])
+
+    for top_folder, group in groupby(records, key=top_level):
+        yield top_folder, list(group)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    json_path = rym_path = None
+    jobs = DEFAULT_JOBS
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] == '--json' and i + 1 < len(args):
+            json_path = args[i + 1]
+            i += 2
+        elif args[i] == '--rym' and i + 1 < len(args):
+            rym_path = args[i + 1]
+            i += 2
+        elif args[i] in ('-j', '--jobs') and i + 1 < len(args):
+            try:
+                jobs = max(1, int(args[i + 1]))
+            except ValueError:
+                print(f"Invalid value for --jobs: {args[i + 1]}")
+                sys.exit(1)
+            i += 2
+        else:
+            positional.append(args[i])
+            i += 1
+
+    if len(positional) != 1 or not os.path.isdir(positional[0]) or not (json_path or rym_path):
+        print("Usage: LibraryScanner.py LIBRARY_ROOT [--json FILE] [--rym FILE] [--jobs N]")
+        print("Scans the library once and writes the JSONFromFiles artist items and/or the RYMFromFiles list.")
+        sys.exit(1)
+
+    import JSONFromFiles
+    import RYMFromFiles
+
+    library_root = positional[0]
+    rym_results = {}
+    items_written = 0
+    json_out = open(json_path, 'w', encoding='utf-8') if json_path else None
+    try:
+        records = scan_library(library_root, jobs, read_stream=bool(json_out), sort=True)
+        for _, group in group_by_top_level(records, library_root):
+            if json_out:
+                items_written += JSONFromFiles.write_artist_items(group, json_out)
+            if rym_path:
+                RYMFromFiles.collect_albums(group, rym_results)
+    finally:
+        if json_out:
+            json_out.close()
+
+    if json_path:
+        print(f"Wrote {items_written} artist items to '{json_path}'.")
+    if rym_path:
+        with open(rym_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(RYMFromFiles.format_results(rym_results)))
+        print(f"Wrote {sum(len(albums) for albums in rym_results.values())} albums to '{rym_path}'.")
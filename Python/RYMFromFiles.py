@@ -1,89 +1,50 @@
-import os
 import tkinter as tk
 from tkinter import filedialog
-from mutagen.flac import FLAC
-from mutagen.easyid3 import EasyID3
-from mutagen import MutagenError
 import pyperclip
+from LibraryScanner import scan_library
 
-def get_metadata(file_path, ext):
-    try:
-        album = ''
-        artist = ''
-        if ext == '.flac':
-            audio = FLAC(file_path)
-            album = audio.tags.get('ALBUM', [''])[0].strip()
-            artist = audio.tags.get('ALBUMARTIST', audio.tags.get('ARTIST', ['']))
-            artist = artist[0].strip() if artist else ''
-        elif ext == '.mp3':
-            audio = EasyID3(file_path)
-            album = audio.get('album', [''])[0].strip()
-            artist = audio.get('albumartist', audio.get('artist', ['']))
-            artist = artist[0].strip() if artist else ''
-        else:
-            return ('', '')
-        return (album, artist)
-    except MutagenError as e:
-        print(f"Error reading tags from {file_path}: {e}")
-        return ('', '')
-
-def process_directory(directory):
-    results = {}
-    for root, _, files in os.walk(directory):
-        audio_files = []
-        for file in files:
-            ext = os.path.splitext(file)[1].lower()
-            if ext in {'.flac', '.mp3'}:
-                audio_files.append(file)
-        
-        if not audio_files:
-            continue
-
-        album_title = None
-        album_artist = None
-        audio_format = None
-        error = None
-
-        for file in audio_files:
-            ext = os.path.splitext(file)[1].lower()
-            current_format = ext[1:].upper()
-            file_path = os.path.join(root, file)
-            current_album, current_artist = get_metadata(file_path, ext)
-
-            if album_title is None:
-                album_title = current_album
-                album_artist = current_artist
-                audio_format = current_format
-            else:
-                if current_format != audio_format:
-                    error = f"Error: Multiple audio formats in {root}"
-                    break
-                if current_album != album_title:
-                    error = f"Error: Multiple album titles in {root}"
-                    break
-                if current_artist != album_artist:
-                    error = f"Error: Multiple album artists in {root}"
-                    break
+def check_album(record):
+    """Returns an error message if the tracks of a scanned album folder disagree on format, album or artist."""
+    first_track = record.tracks[0]
+    for track in record.tracks[1:]:
+        if track.format != first_track.format:
+            return f"Error: Multiple audio formats in {record.path}"
+        if track.album != first_track.album:
+            return f"Error: Multiple album titles in {record.path}"
+        if track.artist != first_track.artist:
+            return f"Error: Multiple album artists in {record.path}"
+    return None
 
+def collect_albums(album_records, results):
+    """Adds (album_title, format) to results[album_artist] for each consistent album folder."""
+    for record in album_records:
+        error = check_album(record)
         if error:
             print(error)
         else:
-            if album_artist not in results:
-                results[album_artist] = []
-            results[album_artist].append((album_title, audio_format))
+            first_track = record.tracks[0]
+            results.setdefault(first_track.artist, []).append((first_track.album, first_track.format))
 
-    # Prepare output
+def format_results(results):
+    """Returns the output lines: a header per artist followed by one line per album."""
     output_lines = []
-    print("\nResults:")
     for artist, albums in results.items():
-        header = f"[b]{artist} [, Folder][/b]\n"
-        print(header)
-        output_lines.append(header)
+        output_lines.append(f"[b]{artist} [, Folder][/b]\n")
         for album, fmt in albums:
-            line = f"[, {album}, {fmt}]"
-            print(line)
-            output_lines.append(line)
+            output_lines.append(f"[, {album}, {fmt}]")
         output_lines.append("")  # Add a blank line between artists
+    return output_lines
+
+def process_directory(directory):
+    results = {}
+    collect_albums(scan_library(directory, read_stream=False), results)
+
+    # Prepare output
+    output_lines = format_results(results)
+    print("\nResults:")
+    for line in output_lines:
+        if line:
+            print(line)
     
     # Copy to clipboard
     output_str = '\n'.join(output_lines)
@@ -0,0 +1,24 @@
+"""Builds small tagged libraries for the AudioOrganizer tests."""
+
+import os
+import struct
+
+from mutagen.flac import FLAC
+
+
+def make_album(folder, album, year, tracks=2, disc=None):
+    """Writes an already organized album: tagged FLAC files named '01 Artist - Song 1.flac'."""
+    os.makedirs(folder)
+    # STREAMINFO for 4096-sample blocks, 44.1 kHz, 2 channels, 16 bits, 441000 samples.
+    stream_info = struct.pack('>HH', 4096, 4096) + b'\0' * 6
+    stream_info += ((44100 << 44) | (1 << 41) | (15 << 36) | 441000).to_bytes(8, 'big') + b'\0' * 16
+    for track in range(1, tracks + 1):
+        path = os.path.join(folder, f"{track:02d} Artist - Song {track}.flac")
+        with open(path, 'wb') as f:
+            f.write(b'fLaC' + bytes([0x80]) + len(stream_info).to_bytes(3, 'big') + stream_info)
+        audio = FLAC(path)
+        audio.update({'title': f"Song {track}", 'artist': 'Artist', 'albumartist': 'Artist', 'album': album,
+                      'date': year, 'tracknumber': str(track)})
+        if disc:
+            audio['discnumber'] = disc
+        audio.save()
@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import AudioBenchmark
+import AudioOrganizer
+
+
+def test_ogg_metadata_block_picture_counts_as_cover(tmp_path):
+    album = tmp_path / 'Album'
+    album.mkdir()
+    cover = b'\xff\xd8\xff' + bytes(range(256)) * 8
+    for track in (1, 2):
+        tags = {'title': f"Song {track}", 'artist': 'Artist', 'albumartist': 'Artist', 'album': 'Album',
+                'tracknumber': str(track), 'date': '2001'}
+        AudioBenchmark.write_ogg(str(album / f"{track:02d} Artist - Song {track}.ogg"), tags, cover, 10)
+
+    info = AudioOrganizer.analyze_album_folder(str(album), os.listdir(album))
+    assert [md.cover_art_count for md in info['files_metadata']] == [1, 1]
+    assert len({md.cover_art_hash for md in info['files_metadata']}) == 1
+
+    [(warnings, _)] = AudioOrganizer.check_albums([info])
+    assert "[Missing Cover]" not in warnings
+    assert "[Inconsistent Covers]" not in warnings
@@ -0,0 +1,45 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import AudioOrganizer
+from library import make_album
+
+
+def snapshot(root):
+    """Returns every path under root with its size and modification time."""
+    entries = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames + filenames:
+            path = os.path.join(dirpath, name)
+            stat = os.stat(path)
+            entries[os.path.relpath(path, root)] = (stat.st_size, stat.st_mtime_ns) if name in filenames else None
+    return entries
+
+
+def test_plan_out_leaves_the_library_untouched(tmp_path):
+    library = tmp_path / 'library'
+    make_album(library / 'Box' / 'CD1', 'Boxed', '2001')
+    make_album(library / 'Box' / 'CD2', 'Boxed', '2001')
+    make_album(library / 'misnamed', 'Greatest Hits', '1999', disc='1')
+    before = snapshot(library)
+
+    AudioOrganizer.organize_music_folders(str(library), force_yes=True, plan_out=str(tmp_path / 'plan.jsonl'))
+    assert snapshot(library) == before
+
+    plan = AudioOrganizer.read_plan(str(tmp_path / 'plan.jsonl'))
+    assert plan['folder'] == [(str(library / 'misnamed'), str(library / 'Greatest Hits'))]
+    assert "[Container Folder] 'Box' was skipped." in plan['warning']
+
+
+def test_plan_with_only_tag_edits_counts_them(tmp_path, capsys):
+    library = tmp_path / 'library'
+    make_album(library / 'Greatest Hits', 'Greatest Hits', '1999', disc='1')
+
+    AudioOrganizer.organize_music_folders(str(library), plan_out=str(tmp_path / 'plan.jsonl'))
+    AudioOrganizer.log.flush()
+    output = capsys.readouterr().out
+    assert "and 2 tag edits" in output
+    assert "No changes needed" not in output
+    assert len(AudioOrganizer.read_plan(str(tmp_path / 'plan.jsonl'))['tag_edit']) == 2
@@ -0,0 +1,46 @@
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import AudioOrganizer
+from library import make_album
+
+
+def batch_renames(library, plan_path):
+    """Returns the (folder, file) renames a full check-only run would plan for the library."""
+    AudioOrganizer.organize_music_folders(str(library), check_only=True, plan_out=str(plan_path))
+    plan = AudioOrganizer.read_plan(str(plan_path))
+    return plan['folder'], plan['file']
+
+
+def test_watch_then_batch_plans_no_renames(tmp_path):
+    library = tmp_path / 'library'
+    make_album(library / 'Greatest Hits', 'Greatest Hits', '1999')
+    make_album(library / 'Other', 'Other', '2001')
+    assert batch_renames(library, tmp_path / 'plan.jsonl') == ([], [])
+    watcher = AudioOrganizer.LibraryWatcher(str(library), force_yes=True, use_polling=True)
+
+    make_album(library / 'incoming', 'Greatest Hits', '2005')
+    watcher.process_folders([str(library / 'incoming')])
+    assert sorted(os.listdir(library)) == ['Greatest Hits (1999)', 'Greatest Hits (2005)', 'Other']
+    assert batch_renames(library, tmp_path / 'plan.jsonl') == ([], [])
+
+    make_album(library / 'incoming again', 'Greatest Hits', '1999')
+    watcher.process_folders([str(library / 'incoming again')])
+    assert sorted(os.listdir(library)) == ['Greatest Hits (1999) (1)', 'Greatest Hits (1999) (2)',
+                                           'Greatest Hits (2005)', 'Other']
+    assert batch_renames(library, tmp_path / 'plan.jsonl') == ([], [])
+
+
+def test_watch_restores_the_plain_title_when_a_shared_title_goes_away(tmp_path):
+    library = tmp_path / 'library'
+    make_album(library / 'Greatest Hits (1999)', 'Greatest Hits', '1999')
+    make_album(library / 'Greatest Hits (2005)', 'Greatest Hits', '2005')
+    watcher = AudioOrganizer.LibraryWatcher(str(library), force_yes=True, use_polling=True)
+
+    shutil.rmtree(library / 'Greatest Hits (2005)')
+    watcher.process_folders([str(library / 'Greatest Hits (2005)')])
+    assert os.listdir(library) == ['Greatest Hits']
+    assert batch_renames(library, tmp_path / 'plan.jsonl') == ([], [])